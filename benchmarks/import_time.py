@@ -0,0 +1,63 @@
+"""Measure the cold start of `import fff` and of opening an image.
+
+Every sample runs in a fresh interpreter. Exits with status 1 when the median
+import time exceeds the budget, or when `import fff` loads any of `LAZY_MODULES`.
+
+Usage: python benchmarks/import_time.py [IMAGE] [--budget MS] [--repeat N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+LAZY_MODULES = ['IPython', 'tabulate', 'hexdump', 'magic', 'numpy', 'PIL', 'concurrent.futures',
+                'sqlite3']
+
+PROBE = '''
+import sys, time
+begin = time.perf_counter()
+import fff
+imported = time.perf_counter()
+loaded = [m for m in {lazy!r} if m in sys.modules]
+if {filepath!r}:
+    fff.DiskImage({filepath!r}).close()
+opened = time.perf_counter()
+print(imported - begin, opened - imported, ','.join(loaded))
+'''
+
+
+def sample(filepath: str):
+    code = PROBE.format(filepath=filepath, lazy=LAZY_MODULES)
+    out = subprocess.check_output([sys.executable, '-c', code]).decode().split()
+    return float(out[0]), float(out[1]), out[2].split(',') if len(out) > 2 else []
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('image', nargs='?', default='')
+    parser.add_argument('--budget', type=float, default=150, help='milliseconds')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv[1:])
+
+    samples = [sample(args.image) for _ in range(args.repeat)]
+    imports = statistics.median(s[0] for s in samples) * 1000
+    opens = statistics.median(s[1] for s in samples) * 1000
+    eager = sorted(set(m for s in samples for m in s[2]))
+
+    print('import fff:      {:>8.1f} ms (budget {:.0f} ms)'.format(imports, args.budget))
+    if args.image:
+        print('fff.DiskImage(): {:>8.1f} ms'.format(opens))
+
+    failed = False
+    if imports > args.budget:
+        print('FAIL: import fff exceeds the budget')
+        failed = True
+    if eager:
+        print('FAIL: loaded by import fff: {}'.format(', '.join(eager)))
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,103 @@
+"""Compare a full MFT walk over the file and the memory-mapped disk backends.
+
+The walk parses every file. The record pass only reads the raw MFT entries;
+it is timed without tracing allocations, best of `REPEAT` runs, then run once
+more for the peak of the memory allocated while reading them. The stream pass
+hashes the data of $MFT through `File.read`, which shows the copies made on
+the data path.
+
+Usage: python benchmarks/mft_walk.py IMAGE [PARTITION_INDEX]
+"""
+import fff
+
+import hashlib
+import sys
+import time
+import tracemalloc
+
+REPEAT = 5
+
+
+def walk(filepath: str, index: int, use_mmap: bool):
+    tracemalloc.start()
+    begin = time.perf_counter()
+
+    disk = fff.DiskImage(filepath, use_mmap=use_mmap)
+    fs = disk.volume[index].filesystem
+    n = sum(1 for _ in fs.files)
+
+    elapsed = time.perf_counter() - begin
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    disk.close()
+
+    allocations = sum(s.count for s in snapshot.statistics('filename'))
+    return n, elapsed, allocations, peak
+
+
+def records(filepath: str, index: int, use_mmap: bool):
+    disk = fff.DiskImage(filepath, use_mmap=use_mmap)
+    mft = disk.volume[index].filesystem.mft
+    elapsed = float('inf')
+    for _ in range(REPEAT):
+        mft.clear()
+        begin = time.perf_counter()
+        for inode in range(mft.entry_total):
+            mft.record(inode)
+        elapsed = min(elapsed, time.perf_counter() - begin)
+
+    mft.clear()
+    tracemalloc.start()
+    for inode in range(mft.entry_total):
+        mft.record(inode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    disk.close()
+    return mft.entry_total, elapsed, peak
+
+
+def stream(filepath: str, index: int, use_mmap: bool):
+    disk = fff.DiskImage(filepath, use_mmap=use_mmap)
+    mft = disk.volume[index].filesystem.mft
+    tracemalloc.start()
+    begin = time.perf_counter()
+    h = hashlib.sha1()
+    for chunk in mft.read(count=mft.size):
+        h.update(chunk)
+    elapsed = time.perf_counter() - begin
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    disk.close()
+    return mft.size, elapsed, peak
+
+
+def first_ntfs(filepath: str) -> int:
+    disk = fff.DiskImage(filepath)
+    try:
+        return next(e.index for e in disk.volume.entities
+                    if getattr(e, 'partition_type', None) == 0x07)
+    finally:
+        disk.close()
+
+
+def main(argv):
+    filepath = argv[1]
+    index = int(argv[2]) if len(argv) > 2 else first_ntfs(filepath)
+
+    for use_mmap in [False, True]:
+        n, elapsed, peak = records(filepath, index, use_mmap)
+        print('{:<6} records: {:>8}  time: {:>8.3f}s  peak: {:>12} B'.format(
+            'mmap' if use_mmap else 'file', n, elapsed, peak))
+    for use_mmap in [False, True]:
+        n, elapsed, peak = stream(filepath, index, use_mmap)
+        print('{:<6} bytes: {:>12}  time: {:>8.3f}s  peak: {:>12} B'.format(
+            'mmap' if use_mmap else 'file', n, elapsed, peak))
+    for use_mmap in [False, True]:
+        n, elapsed, allocations, peak = walk(filepath, index, use_mmap)
+        print('{:<6} files: {:>8}  time: {:>8.3f}s  live blocks: {:>10}  peak: {:>12} B'.format(
+            'mmap' if use_mmap else 'file', n, elapsed, allocations, peak))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
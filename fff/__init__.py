@@ -1,19 +1,21 @@
+from .disk import Disk, FileDisk, RawDisk, SplitDisk, MMapDisk, GzipDisk, ZipDisk, IndexedDisk
+from .block_cache import BlockCache
+from .readahead import Readahead
+from . import zran
 from .disk_view import DiskView
 from .entity import Entity
 from .unallocated_space import UnallocatedSpace
 from .partition import Partition
 from .abstract_file import AbstractFile
+from .ntfs.metadata_store import MetadataStore
 
-from tabulate import tabulate
-from hexdump import hexdump as hd
-import magic
-
+import os
 import struct
 import operator
 from functools import reduce
 from zipfile import ZipFile
 import gzip
-from typing import Sequence, Optional
+from typing import Sequence, Optional, Union
 
 
 class MBR(Entity):
@@ -23,7 +25,7 @@ class MBR(Entity):
 
     SECTOR_SIZE = 512
 
-    def __init__(self, disk_view, number: int = 0, parent=None):
+    def __init__(self, disk_view, number: int = 0, parent=None, image=None):
         disk = disk_view.disk
         offset = disk_view.begin
         size = disk_view.size
@@ -32,6 +34,7 @@ class MBR(Entity):
         self.dv = disk_view
         self.number = number
         self.parent = parent
+        self.image = image
         self.first_sector = disk_view.begin // MBR.SECTOR_SIZE
         self.last_sector = self.first_sector + size // MBR.SECTOR_SIZE
 
@@ -145,6 +148,7 @@ class MBR(Entity):
 
     def hexdump(self):
         data = self.read(0, 512)
+        from hexdump import hexdump as hd
         return hd(data)
 
     def tabulate(self):
@@ -153,6 +157,7 @@ class MBR(Entity):
 
     def __str__(self):
         rows = reduce(operator.add, [e.tabulate() for e in self.entities])
+        from tabulate import tabulate
         return tabulate(rows,
                         headers=['#', 'Slot', 'Start', 'End', 'Length', 'Description'])
 
@@ -161,30 +166,126 @@ class MBR(Entity):
 
 
 class DiskImage(object):
-    def __init__(self, filepath):
+    """
+    A disk image file, the entry point of all analysis.
+
+    Parameters
+    ----------
+    filepath : str or Sequence[str]
+        The path of the disk image. Raw, ZIP and gzip images are supported.
+        A random access index of a compressed image is persisted next to it
+        with the ".fffidx" suffix when the directory is writable.
+        A raw image split into segments is opened by the path of its first
+        segment, e.g. "disk.001", or by the list of the segment paths.
+    use_mmap : bool
+        Memory-map raw images instead of reading them through a file object.
+        Data read from a memory-mapped image is returned as `memoryview` slices
+        of the mapping, which avoids copying sectors around. Each segment of a
+        split image is mapped on its own, and reads spanning two segments are
+        copied. Compressed images are never mapped.
+    member : str, optional
+        The member of a ZIP archive holding the image. Defaults to the first
+        file in the archive.
+    cache_size : int
+        The byte budget of the block cache shared by all views of this image,
+        0 disables it. Memory-mapped images are never cached.
+    cache_block_size : int
+        The size of a cached block, a multiple of the sector and cluster sizes.
+        It is clamped to a quarter of `cache_size`.
+    readahead : int
+        The maximum number of bytes read ahead of sequential reads, 0 disables
+        readahead, e.g. for random workloads. Memory-mapped images rely on the
+        readahead of the operating system instead.
+    metadata_path : str, optional
+        The path of a SQLite database keeping the name and cluster indexes of the
+        NTFS volumes of the image, so they are only built by the first open.
+    index_path : str, optional
+        Where to persist the random access index of a compressed image, instead
+        of next to it.
+    """
+
+    def __init__(self, filepath: Union[str, Sequence[str]], use_mmap: bool = False,
+                 member: Optional[str] = None,
+                 cache_size: int = BlockCache.DEFAULT_CAPACITY,
+                 cache_block_size: int = BlockCache.DEFAULT_BLOCK_SIZE,
+                 readahead: int = Readahead.DEFAULT_MAX_WINDOW,
+                 metadata_path: Optional[str] = None, index_path: Optional[str] = None):
+        if isinstance(filepath, str):
+            segments = SplitDisk.segments_of(filepath)
+        else:
+            segments = list(filepath)
+            filepath = segments[0]
         self.filepath = filepath
+        # The path, size and modification time of each file of the image, which
+        # tell apart images written over at the same path.
+        self.identity = [(os.path.abspath(p), s.st_size, s.st_mtime_ns)
+                         for p, s in ((p, os.stat(p)) for p in segments)]
+        # Everything needed to open the image again, e.g. in another process.
+        self.options = dict(filepath=segments if len(segments) > 1 else filepath,
+                            use_mmap=use_mmap, member=member, cache_size=cache_size,
+                            cache_block_size=cache_block_size, readahead=readahead,
+                            metadata_path=metadata_path, index_path=index_path)
+        self.metadata = MetadataStore(metadata_path) if metadata_path else None
+
+        import magic
 
         self.mime = magic.from_file(self.filepath, mime=True)
-        if not self.mime:
-            self._archive = None
-            self._file = open(filepath, 'rb')
+        self._archive = None
+        if not self.mime or self.mime == 'application/octet-stream':
+            if len(segments) > 1:
+                self._disk: Disk = SplitDisk(segments, use_mmap=use_mmap)
+            elif use_mmap:
+                self._disk = MMapDisk(filepath)
+            else:
+                self._disk = RawDisk(filepath)
         elif self.mime == 'application/zip':
-            self._archive = ZipFile(self.filepath)
-            first_file = self._archive.namelist()[0]
-            self._file = self._archive.open(first_file)
+            with ZipFile(self.filepath) as archive:
+                if member is None:
+                    info = next((i for i in archive.infolist() if not i.is_dir()), None)
+                    if info is None:
+                        raise ValueError('No file in archive "{}"'.format(self.filepath))
+                else:
+                    info = archive.getinfo(member)
+            if ZipDisk.is_supported(info):
+                self._disk = ZipDisk(self.filepath, info.filename, index_path=index_path)
+            else:
+                self._archive = ZipFile(self.filepath)
+                self._disk = FileDisk(self._archive.open(info))
         elif self.mime in ['application/x-gzip', 'application/gzip']:
             # magic uses x-gzip, IANA defines gzip
             # See https://www.iana.org/assignments/media-types/media-types.xhtml
-            self._archive = None
-            self._file = gzip.open(self.filepath)
+            if zran.available():
+                self._disk = GzipDisk(self.filepath, index_path=index_path)
+            else:
+                self._disk = FileDisk(gzip.open(self.filepath))
         else:
             assert 'Unsupported MIME: {}'.format(self.mime) and False
 
-        self._file.seek(0, 2)
-        dv = DiskView(self._file, 0, self._file.tell())
-        self.volume = MBR(dv)
+        # Whether opening the image again, e.g. in a worker process, is cheap. A
+        # compressed image is not when its index could not be persisted: it would be
+        # decompressed whole again.
+        self.reopenable = (isinstance(self._disk, (RawDisk, MMapDisk, SplitDisk)) or
+                           isinstance(self._disk, IndexedDisk) and self._disk.reopenable)
+
+        # Mapped images rely on the page cache and readahead of the operating system.
+        mapped = use_mmap and isinstance(self._disk, (MMapDisk, SplitDisk))
+        self.readahead: Optional[Readahead] = None
+        if readahead > 0 and not mapped:
+            self.readahead = Readahead(self._disk, max_window=readahead,
+                                       min_window=min(readahead, Readahead.DEFAULT_MIN_WINDOW))
+            self._disk = self.readahead
+
+        self.cache: Optional[BlockCache] = None
+        if cache_size > 0 and not mapped:
+            self.cache = BlockCache(self._disk, cache_size, cache_block_size)
+            self._disk = self.cache
+
+        dv = DiskView(self._disk, 0, self._disk.size)
+        self.volume = MBR(dv, image=self)
 
     def close(self):
-        self._file.close()
+        self._disk.close()
+        if self.metadata:
+            self.metadata.close()
         if self._archive:
             self._archive.close()
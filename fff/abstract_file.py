@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod, abstractproperty
 from typing import Iterable
 
+from .disk import Buffer
+
 
 class AbstractFile(ABC):
     """
@@ -57,7 +59,7 @@ class AbstractFile(ABC):
         pass
 
     @abstractmethod
-    def read(self, count: int, skip: int, bsize: int) -> Iterable[bytes]:
+    def read(self, count: int, skip: int, bsize: int) -> Iterable[Buffer]:
         """Read file data at given location.
         Abstract method.
 
@@ -72,14 +74,15 @@ class AbstractFile(ABC):
 
         Returns
         -------
-        Iterable[bytes]
-            The result is a generate of bytes.
+        Iterable[Buffer]
+            The result is a generate of bytes, or of `memoryview` slices where the
+            data is not copied, e.g. from a memory-mapped image.
 
         Examples
         --------
         Read the 2nd cluster of the file.
 
-        >>> f.read(count=1, skip=1, bsize=fs.cluster_size)
+        >>> b''.join(f.read(count=1, skip=1, bsize=fs.cluster_size))
         b'This is the data contained in the second cluster of this file... [truncated]'
         """
         pass
@@ -0,0 +1,158 @@
+from .disk import Disk, Buffer
+
+from collections import OrderedDict
+from typing import List
+import threading
+
+
+class CacheStats(object):
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypasses = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def tabulate(self):
+        return [['Hits', self.hits],
+                ['Misses', self.misses],
+                ['Hit Ratio', '{:.2%}'.format(self.hit_ratio)],
+                ['Evictions', self.evictions],
+                ['Bypasses', self.bypasses], ]
+
+    def __str__(self):
+        from tabulate import tabulate
+        return tabulate(self.tabulate())
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class BlockCache(Disk):
+    """
+    A size-bounded LRU cache of fixed size blocks in front of another disk.
+
+    All `DiskView` objects of a `DiskImage` share one disk, so they share one cache.
+    Blocks are aligned to `block_size` on the underlying disk, which should be a
+    multiple of the sector and cluster sizes. Consecutive missing blocks are fetched
+    with a single read.
+
+    Parameters
+    ----------
+    disk : Disk
+        The underlying disk.
+    capacity : int
+        The maximum number of cached bytes.
+    block_size : int
+        The size of a cached block in bytes. It is clamped to a quarter of
+        `capacity`, the largest read that is cached, so a small cache still
+        holds blocks.
+    """
+
+    DEFAULT_CAPACITY = 64 << 20
+    DEFAULT_BLOCK_SIZE = 64 << 10
+
+    def __init__(self, disk: Disk, capacity: int = DEFAULT_CAPACITY,
+                 block_size: int = DEFAULT_BLOCK_SIZE):
+        assert block_size > 0 and capacity > 0
+
+        self.disk = disk
+        self.capacity = capacity
+        self.block_size = min(block_size, max(1, capacity // 4))
+        self.stats = CacheStats()
+
+        self._blocks: 'OrderedDict[int, bytes]' = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self.disk.size
+
+    @property
+    def cached_bytes(self) -> int:
+        return self._size
+
+    def _lookup(self, first: int, last: int) -> List:
+        with self._lock:
+            blocks = []
+            for i in range(first, last + 1):
+                block = self._blocks.get(i)
+                if block is None:
+                    self.stats.misses += 1
+                else:
+                    self._blocks.move_to_end(i)
+                    self.stats.hits += 1
+                blocks.append(block)
+            return blocks
+
+    def _insert(self, index: int, block: bytes):
+        with self._lock:
+            if index in self._blocks:
+                return
+            self._blocks[index] = block
+            self._size += len(block)
+            while self._size > self.capacity:
+                _, evicted = self._blocks.popitem(last=False)
+                self._size -= len(evicted)
+                self.stats.evictions += 1
+
+    def _fetch(self, first: int, count: int) -> List[bytes]:
+        bs = self.block_size
+        data = bytes(self.disk.read(count * bs, first * bs))
+        blocks = [data[i*bs:(i+1)*bs] for i in range(count)]
+        for i, block in enumerate(blocks):
+            if block:
+                self._insert(first + i, block)
+        return blocks
+
+    def read(self, size: int, offset: int) -> Buffer:
+        if size <= 0:
+            return b''
+
+        bs = self.block_size
+        first = offset // bs
+        last = (offset + size - 1) // bs
+
+        # Large streaming reads would only flush the cache.
+        if (last - first + 1) * bs > self.capacity // 4:
+            with self._lock:
+                self.stats.bypasses += 1
+            return self.disk.read(size, offset)
+
+        blocks = self._lookup(first, last)
+        i = 0
+        while i < len(blocks):
+            if blocks[i] is not None:
+                i += 1
+                continue
+            j = i
+            while j < len(blocks) and blocks[j] is None:
+                j += 1
+            blocks[i:j] = self._fetch(first + i, j - i)
+            i = j
+
+        begin = offset - first * bs
+        if len(blocks) == 1:
+            return memoryview(blocks[0])[begin:begin+size]
+        return b''.join(blocks)[begin:begin+size]
+
+    def clear(self):
+        with self._lock:
+            self._blocks.clear()
+            self._size = 0
+
+    def close(self):
+        self.clear()
+        self.disk.close()
+
+    def __str__(self):
+        return '<BlockCache {}/{} bytes, {} hits, {} misses>'.format(
+            self._size, self.capacity, self.stats.hits, self.stats.misses)
+
+    def __repr__(self):
+        return self.__str__()
@@ -1,10 +1,19 @@
-from typing import TYPE_CHECKING
+from typing import Iterable, List, Tuple, TYPE_CHECKING
+import operator
 
 if TYPE_CHECKING:
     from .disk_view import DiskView
 
 
 class DataUnits(object):
+    """
+    Sectors or clusters of a `DiskView`.
+
+    Units are indexed by an int, a slice, or a sequence of ints such as a list or a
+    NumPy array. A sequence gathers scattered units, reading each run of adjacent
+    indices with a single read of the underlying view.
+    """
+
     def __init__(self, dv: 'DiskView', unit_size: int, unit_count: int):
         self.dv = dv
         self.unit_size = unit_size
@@ -16,6 +25,56 @@ class DataUnits(object):
         else:
             return self.unit_count + index
 
+    def _runs(self, indices: Iterable[int]) -> List[Tuple[int, int]]:
+        """Coalesce indices into `(first, count)` runs of adjacent units, in order."""
+        runs: List[Tuple[int, int]] = []
+        for i in indices:
+            i = self._convert(operator.index(i))
+            if runs and runs[-1][0] + runs[-1][1] == i:
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((i, 1))
+        return runs
+
+    def gather(self, indices: Iterable[int]) -> List[memoryview]:
+        """Read the units at `indices`.
+
+        Parameters
+        ----------
+        indices : Iterable[int]
+            The indices of the units, in any order and possibly repeated.
+
+        Returns
+        -------
+        List[memoryview]
+            One buffer per index, in the order of `indices`.
+        """
+        units = []
+        n = self.unit_size
+        for first, count in self._runs(indices):
+            data = memoryview(self.dv.read(offset=first * n, size=count * n))
+            units += [data[i*n:(i+1)*n] for i in range(count)]
+        return units
+
+    def array(self, indices: Iterable[int]):
+        """Read the units at `indices` into a NumPy array.
+
+        Returns
+        -------
+        numpy.ndarray
+            An array of `numpy.uint8` of shape `(len(indices), unit_size)`.
+        """
+        import numpy as np
+
+        runs = self._runs(indices)
+        r = np.empty((sum(count for _, count in runs), self.unit_size), dtype=np.uint8)
+        row = 0
+        for first, count in runs:
+            data = self.dv.read(offset=first * self.unit_size, size=count * self.unit_size)
+            r[row:row+count] = np.frombuffer(data, dtype=np.uint8).reshape(count, -1)
+            row += count
+        return r
+
     def __getitem__(self, index_or_slice):
         if isinstance(index_or_slice, int):
             offset = self._convert(index_or_slice) * self.unit_size
@@ -26,6 +85,11 @@ class DataUnits(object):
             end = self._convert(s.stop) * self.unit_size
             n = end - begin
             return self.dv.read(offset=begin, size=n)
+        elif hasattr(index_or_slice, '__index__'):
+            # e.g. numpy.int64
+            return self[operator.index(index_or_slice)]
+        else:
+            return self.gather(index_or_slice)
 
     def __len__(self):
         return self.unit_count
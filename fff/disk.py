@@ -0,0 +1,402 @@
+from . import zran
+
+from abc import ABC, abstractmethod, abstractproperty
+from typing import IO, List, Optional, Sequence, Union
+from io import BufferedIOBase
+from bisect import bisect_right
+from zipfile import ZipFile, ZipInfo, ZIP_STORED, ZIP_DEFLATED
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+
+
+Buffer = Union[bytes, memoryview]
+
+
+def pread(fd: int, size: int, offset: int) -> bytes:
+    """Read `size` bytes at `offset` of a file descriptor without moving its position."""
+    chunks = []
+    while size > 0:
+        data = os.pread(fd, size, offset)
+        if not data:
+            break
+        chunks.append(data)
+        size -= len(data)
+        offset += len(data)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
+
+
+class Disk(ABC):
+    """
+    This is the random access storage interface underneath `DiskView`.
+
+    Reads are positional, i.e. `read` never depends on the result of a previous call,
+    and every implementation is safe to use from multiple threads.
+    """
+
+    @abstractproperty
+    def size(self) -> int:
+        """int: The size of this disk in bytes. Abstract property.
+        """
+        pass
+
+    @abstractmethod
+    def read(self, size: int, offset: int) -> Buffer:
+        """Read data at given location.
+        Abstract method.
+
+        Parameters
+        ----------
+        size : int
+            The number of bytes to read.
+        offset : int
+            The absolute offset on this disk to read from.
+
+        Returns
+        -------
+        bytes or memoryview
+            A bytes-like object. Backends that can avoid copying return a memoryview.
+        """
+        pass
+
+    def close(self):
+        pass
+
+
+class FileDisk(Disk):
+    """
+    A disk backed by a seekable file object, e.g. an archive member.
+
+    The file position is shared, so `seek` and `read` are serialized with a lock.
+    """
+
+    def __init__(self, file: Union[IO[bytes], BufferedIOBase]):
+        self.file = file
+        self.file.seek(0, 2)
+        self._size = self.file.tell()
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def read(self, size: int, offset: int) -> Buffer:
+        with self._lock:
+            self.file.seek(offset)
+            return self.file.read(size)
+
+    def close(self):
+        self.file.close()
+
+
+class RawDisk(Disk):
+    """
+    A raw image or block device read with `os.pread`, so concurrent reads from
+    different threads do not interfere with each other.
+
+    Falls back to a locked `seek` and `read` where `os.pread` is not available.
+    """
+
+    def __init__(self, filepath: str):
+        self._file = open(filepath, 'rb')
+        self._fd = self._file.fileno()
+        # Unlike `fstat`, this also works for block devices.
+        self._size = os.lseek(self._fd, 0, os.SEEK_END)
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def read(self, size: int, offset: int) -> Buffer:
+        if hasattr(os, 'pread'):
+            return pread(self._fd, size, offset)
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def close(self):
+        self._file.close()
+
+
+class SplitDisk(Disk):
+    """
+    A raw image split into segments, e.g. "disk.001", "disk.002", ..., presented as
+    one contiguous disk.
+
+    The segment holding an offset is found with a binary search, and reads spanning
+    segment boundaries only read the requested bytes of each segment.
+
+    Parameters
+    ----------
+    filepaths : Sequence[str]
+        The paths of the segments, in order.
+    use_mmap : bool
+        Memory-map each segment, see `MMapDisk`. Reads within a segment are then
+        `memoryview` slices of its mapping, reads spanning segments are copied.
+    """
+
+    SEGMENT_PATTERN = re.compile(r'^(.*\.)(\d{3,})$')
+
+    def __init__(self, filepaths: Sequence[str], use_mmap: bool = False):
+        assert filepaths
+
+        # Empty files cannot be mapped.
+        self.segments: List[Disk] = [
+            MMapDisk(f) if use_mmap and os.path.getsize(f) else RawDisk(f) for f in filepaths]
+        self.starts: List[int] = []
+        offset = 0
+        for s in self.segments:
+            self.starts.append(offset)
+            offset += s.size
+        self._size = offset
+
+    @staticmethod
+    def segments_of(filepath: str) -> List[str]:
+        """Returns the path of all segments, given the path of the first one.
+
+        Segments are numbered by an extension of at least 3 digits, such as ".001",
+        and counting stops at the first missing number.
+        """
+        m = SplitDisk.SEGMENT_PATTERN.match(filepath)
+        if not m:
+            return [filepath]
+        prefix, number = m.group(1), m.group(2)
+        filepaths = []
+        i = int(number)
+        while True:
+            f = '{}{:0{}d}'.format(prefix, i, len(number))
+            if not os.path.isfile(f):
+                break
+            filepaths.append(f)
+            i += 1
+        return filepaths
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def read(self, size: int, offset: int) -> Buffer:
+        size = max(0, min(size, self._size - offset))
+        i = bisect_right(self.starts, offset) - 1
+        pieces = []
+        while size > 0 and i < len(self.segments):
+            segment = self.segments[i]
+            location = offset - self.starts[i]
+            n = min(size, segment.size - location)
+            if n > 0:
+                pieces.append(segment.read(n, location))
+                size -= n
+                offset += n
+            i += 1
+        if len(pieces) == 1:
+            return pieces[0]
+        return b''.join(pieces)
+
+    def close(self):
+        for s in self.segments:
+            s.close()
+
+
+class MMapDisk(Disk):
+    """
+    A disk backed by a read-only memory mapping of a raw image.
+
+    Reads return `memoryview` slices into the mapping, so no data is copied until a
+    parser explicitly asks for `bytes`.
+    """
+
+    def __init__(self, filepath: str):
+        self._file = open(filepath, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+    @property
+    def size(self) -> int:
+        return len(self._mmap)
+
+    def read(self, size: int, offset: int) -> Buffer:
+        return self._view[offset:offset+size]
+
+    def close(self):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Slices handed out by `read` are still alive, the mapping is released
+            # when the last of them is garbage collected.
+            pass
+        self._file.close()
+
+
+class IndexedDisk(Disk):
+    """
+    The base of compressed disks read through a `zran.DeflateIndex`.
+
+    A `zran.DeflateReader` keeps decompression state between reads, so each thread
+    gets its own reader and file handle. Threads thus decompress in parallel, as
+    zlib runs without holding the GIL.
+    """
+
+    def __init__(self, filepath: str, index: zran.DeflateIndex, begin: int = 0,
+                 length: Optional[int] = None):
+        self.filepath = filepath
+        self.index = index
+        self.begin = begin
+        self.length = length
+
+        self._local = threading.local()
+        self._files: List[IO[bytes]] = []
+        self._lock = threading.Lock()
+
+    def _reader(self) -> zran.DeflateReader:
+        reader = getattr(self._local, 'reader', None)
+        if reader is None:
+            f = open(self.filepath, 'rb')
+            with self._lock:
+                self._files.append(f)
+            reader = zran.DeflateReader(f, self.index, self.begin, self.length)
+            self._local.reader = reader
+        return reader
+
+    @property
+    def size(self) -> int:
+        return self.index.size
+
+    @property
+    def reopenable(self) -> bool:
+        """bool: Whether opening the image again loads the index instead of building it."""
+        return self.index.path is not None
+
+    def read(self, size: int, offset: int) -> Buffer:
+        return self._reader().read(size, offset)
+
+    def close(self):
+        with self._lock:
+            for f in self._files:
+                f.close()
+            self._files = []
+        self._local = threading.local()
+
+
+class GzipDisk(IndexedDisk):
+    """
+    A gzip compressed image with random access through a checkpoint index.
+
+    The index is built by decompressing the image once and is persisted next to it,
+    so later opens are instant. Any offset is then reached by inflating at most
+    `span` bytes from the nearest checkpoint.
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the gzip image.
+    span : int
+        The distance in uncompressed bytes between two checkpoints.
+    index_path : str, optional
+        Where to persist the index. Defaults to the image path plus `INDEX_SUFFIX`.
+        When the location is not writable, the index is only kept in memory.
+    """
+
+    INDEX_SUFFIX = '.fffidx'
+
+    def __init__(self, filepath: str, span: int = zran.DEFAULT_SPAN,
+                 index_path: Optional[str] = None):
+        self.index_path = index_path or filepath + GzipDisk.INDEX_SUFFIX
+        with open(filepath, 'rb') as f:
+            index = zran.DeflateIndex.open(f, self.index_path, span=span)
+        super().__init__(filepath, index)
+
+
+class ZipDisk(IndexedDisk):
+    """
+    An image stored as a member of a ZIP archive, with random access.
+
+    Stored members are read directly from the archive. Deflated members are read
+    through a checkpoint index like `GzipDisk`, persisted next to the archive.
+
+    Parameters
+    ----------
+    filepath : str
+        The path of the ZIP archive.
+    member : str, optional
+        The name of the member holding the image. Defaults to the first file in
+        the archive.
+    span : int
+        The distance in uncompressed bytes between two checkpoints.
+    index_path : str, optional
+        Where to persist the index. Defaults to the archive path, a hash of the
+        member name, and `INDEX_SUFFIX`.
+    """
+
+    INDEX_SUFFIX = '.fffidx'
+
+    LOCAL_HEADER = '<4sHHHHHIIIHH'
+    LOCAL_HEADER_SIGNATURE = b'PK\x03\x04'
+
+    def __init__(self, filepath: str, member: Optional[str] = None,
+                 span: int = zran.DEFAULT_SPAN, index_path: Optional[str] = None):
+        self._file = open(filepath, 'rb')
+        with ZipFile(self._file) as archive:
+            if member is None:
+                member = next((i.filename for i in archive.infolist() if not i.is_dir()), None)
+                if member is None:
+                    raise ValueError('No file in archive "{}"'.format(filepath))
+            self.info: ZipInfo = archive.getinfo(member)
+        self.member = member
+
+        assert ZipDisk.is_supported(self.info), 'Unsupported ZIP member: {}'.format(member)
+
+        begin = self._data_offset()
+        self.index_path = index_path or '{}.{:08x}{}'.format(
+            filepath, zlib.crc32(member.encode()), ZipDisk.INDEX_SUFFIX)
+        self._stored: Optional[RawDisk] = None
+        if self.info.compress_type == ZIP_STORED:
+            index = zran.DeflateIndex([], self.info.file_size, span, raw=True)
+            self._stored = RawDisk(filepath)
+        else:
+            index = zran.DeflateIndex.open(self._file, self.index_path, begin,
+                                           self.info.compress_size, span=span, raw=True)
+        self._file.close()
+        super().__init__(filepath, index, begin, self.info.compress_size)
+
+    @property
+    def reopenable(self) -> bool:
+        return self._stored is not None or super().reopenable
+
+    @staticmethod
+    def is_supported(info: ZipInfo) -> bool:
+        """Whether a member can be read with random access. Encrypted members and
+        compression methods other than stored and deflated are not supported."""
+        if info.flag_bits & 0x1:
+            return False
+        if info.compress_type == ZIP_STORED:
+            return True
+        return info.compress_type == ZIP_DEFLATED and zran.available()
+
+    def _data_offset(self) -> int:
+        # The local header may carry a different extra field than the central directory.
+        self._file.seek(self.info.header_offset)
+        header = self._file.read(struct.calcsize(ZipDisk.LOCAL_HEADER))
+        fields = struct.unpack(ZipDisk.LOCAL_HEADER, header)
+        assert fields[0] == ZipDisk.LOCAL_HEADER_SIGNATURE
+        name_length, extra_length = fields[-2:]
+        return self.info.header_offset + len(header) + name_length + extra_length
+
+    @property
+    def size(self) -> int:
+        return self.info.file_size
+
+    def read(self, size: int, offset: int) -> Buffer:
+        if self._stored is not None:
+            size = max(0, min(size, self.size - offset))
+            return self._stored.read(size, self.begin + offset)
+        return super().read(size, offset)
+
+    def close(self):
+        super().close()
+        if self._stored is not None:
+            self._stored.close()
@@ -1,12 +1,13 @@
 from . import data_units as du
+from .disk import Disk, Buffer
 
 from typing import Optional
 
 
 class DiskView(object):
-    def __init__(self, disk, begin: int, size: int,
+    def __init__(self, disk: Disk, begin: int, size: int,
                  sector_size: Optional[int] = None, cluster_size: Optional[int] = None):
-        assert not isinstance(disk, DiskView)
+        assert isinstance(disk, Disk)
 
         self.disk = disk
         self.begin = begin
@@ -27,17 +28,17 @@ class DiskView(object):
     def size(self):
         return self.end - self.begin
 
-    def _seek(self, offset):
+    def read(self, size: int, offset: int) -> Buffer:
+        """Read `size` bytes at `offset` of this view.
+
+        The read does not depend on any state of the view or the disk, so views over
+        the same disk can be read from multiple threads.
+        """
         location = self.begin + offset
 
         assert location >= self.begin and location < self.end
-        self.disk.seek(location)
-
-    def read(self, size, offset=None):
-        if offset is not None:
-            self._seek(offset)
-        assert self.disk.tell() + size - 1 < self.end
-        return self.disk.read(size)
+        assert location + size - 1 < self.end
+        return self.disk.read(size, location)
 
     def __repr__(self):
         return self.__str__()
@@ -1,7 +1,5 @@
 import struct
 
-from tabulate import tabulate
-
 
 class BootSector(object):
     def __init__(self, disk, sector0):
@@ -43,6 +41,7 @@ class BootSector(object):
                 ['Sectors Before Partition', self.sectors_before_partition], ]
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate())
 
     def __repr__(self):
@@ -72,6 +71,7 @@ class FAT(object):
         pass
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate())
 
     def __repr__(self):
@@ -2,7 +2,10 @@ from .mft_entry import *
 from .boot_sector import *
 from .mft_attr import *
 from .mft import *
+from .name_index import *
+from .cluster_index import *
 from .file import *
+from .dir_entry import *
 from .ntfs import *
 from .vcn import *
 
@@ -1,5 +1,3 @@
-from tabulate import tabulate
-
 import struct
 
 
@@ -37,6 +35,11 @@ class BootSector(object):
     def cluster_size(self) -> int:
         return self.bytes_per_sector * self.sectors_per_cluster
 
+    @property
+    def file_record_size(self) -> int:
+        """int: The size of an MFT entry in bytes."""
+        return int(self.cluster_per_file_record_segment * self.cluster_size)
+
     def _decode_size(self, value: int) -> int:
         if value >= 0:
             return value
@@ -45,7 +48,7 @@ class BootSector(object):
 
     def tabulate(self):
         return [['JMP', self.jmp.hex()],
-                ['Signature', '{}({})'.format(self.signature.decode(),
+                ['Signature', '{}({})'.format(bytes(self.signature).decode(),
                                               self.signature.hex())],
                 ['Bytes Per Sector', self.bytes_per_sector],
                 ['Sectors Per Cluster', self.sectors_per_cluster],
@@ -68,6 +71,7 @@ class BootSector(object):
                 ['Marker', self.marker.hex()], ]
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate(),
                         headers=['Field', 'Value'])
 
@@ -0,0 +1,114 @@
+from .mft_entry import MFTEntry
+from . import parallel
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, NamedTuple, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .mft import MFT
+
+
+class Allocation(NamedTuple):
+    lcn: int
+    length: int         # in clusters
+    inode: int          # of the base entry
+    type_id: int        # of the attribute
+    name: str           # of the attribute
+    vcn: int            # of `lcn` in the attribute
+
+
+def _allocations(mft: 'MFT', first: int, count: int) -> List[Allocation]:
+    r = []
+    for inode in range(first, first + count):
+        e = MFTEntry(mft.record(inode), mft.fs, inode, mft)
+        if not e.in_use:
+            continue
+        base = e.base_ref.inode or inode
+        for h in e.headers:
+            if not h.non_resident:
+                continue
+            for x in h.vcn.extents():
+                if x.lcn is not None:
+                    r.append(Allocation(x.lcn, x.length, base, h.type_id, h.name,
+                                        h.starting_vcn + x.vcn))
+    return r
+
+
+class ClusterIndex(object):
+    """
+    An interval index from clusters to the non-resident attributes allocating them,
+    built with one pass over the MFT.
+
+    Allocations are sorted by their first cluster, next to the furthest cluster
+    reached by any allocation so far. A lookup bisects to the last allocation
+    starting at or before the cluster, then walks back only while earlier
+    allocations can still reach it, which is only more than one step where
+    allocations overlap.
+
+    Parameters
+    ----------
+    allocations : Iterable[Allocation]
+        The allocations of the filesystem, in any order.
+    """
+
+    def __init__(self, allocations: Iterable[Allocation]):
+        self.allocations = sorted(allocations)
+        self._starts = array('q', (a.lcn for a in self.allocations))
+        self._reach = array('q')
+        reach = 0
+        for a in self.allocations:
+            reach = max(reach, a.lcn + a.length)
+            self._reach.append(reach)
+
+    @staticmethod
+    def build(mft: 'MFT', workers: int = 0,
+              chunk_entries: int = parallel.DEFAULT_CHUNK_ENTRIES) -> 'ClusterIndex':
+        """Index the non-resident attributes of all MFT entries in use.
+
+        Entries are parsed `chunk_entries` at a time, in `workers` processes if more than 1.
+        """
+        return ClusterIndex(a for r in parallel.map_entries(mft, _allocations, workers,
+                                                            chunk_entries)
+                            for a in r)
+
+    def _before(self, i: int, cluster: int) -> List[Allocation]:
+        """The allocations up to the `i`th one, ending after `cluster`, in order."""
+        r = []
+        while i >= 0 and self._reach[i] > cluster:
+            a = self.allocations[i]
+            if a.lcn + a.length > cluster:
+                r.append(a)
+            i -= 1
+        r.reverse()
+        return r
+
+    def at(self, cluster: int) -> List[Allocation]:
+        """Returns the allocations of `cluster`."""
+        return self._before(bisect_right(self._starts, cluster) - 1, cluster)
+
+    def overlapping(self, cluster: int, count: int) -> List[Allocation]:
+        """Returns the allocations of any of `count` clusters from `cluster`."""
+        return self._before(bisect_left(self._starts, cluster + count) - 1, cluster)
+
+    def lookup(self, clusters: Iterable[int]) -> List[List[Allocation]]:
+        """Returns the allocations of each of `clusters`."""
+        return [self.at(c) for c in clusters]
+
+    def conflicts(self) -> List[Tuple[Allocation, Allocation]]:
+        """Returns the pairs of allocations of different files sharing clusters."""
+        r = []
+        for i, a in enumerate(self.allocations):
+            for b in self._before(i - 1, a.lcn):
+                if b.inode != a.inode:
+                    r.append((b, a))
+        return r
+
+    def __len__(self):
+        return len(self.allocations)
+
+    def __str__(self):
+        return '<ClusterIndex {} allocations>'.format(len(self))
+
+    def __repr__(self):
+        return self.__str__()
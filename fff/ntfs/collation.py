@@ -0,0 +1,68 @@
+"""Filename collation of NTFS directory indexes, and lookups in them.
+
+Names in $I30 indexes are sorted by their UTF-16 code units after mapping each
+code unit through the $UpCase table of the volume.
+"""
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, Optional, Sequence, TYPE_CHECKING
+import sys
+
+if TYPE_CHECKING:
+    from .mft_attr import IndexEntryFileName
+
+
+UPCASE_ENTRIES = 1 << 16
+
+
+def upcase_table(data: bytes) -> Optional[Dict[int, int]]:
+    """Returns the code units changed by an $UpCase table, for `str.translate`.
+
+    None if `data` is not a whole table.
+    """
+    if len(data) < 2 * UPCASE_ENTRIES:
+        return None
+    table = array('H', bytes(data[:2 * UPCASE_ENTRIES]))
+    if sys.byteorder != 'little':
+        table.byteswap()
+    return {c: u for c, u in enumerate(table) if c != u}
+
+
+def collate(name: str, table: Optional[Dict[int, int]]) -> bytes:
+    """Returns the sort key of `name`. Without `table`, `str.upper` is used."""
+    upper = name.translate(table) if table is not None else name.upper()
+    # Big-endian UTF-16 compares like the code units.
+    return upper.encode('utf-16-be', 'surrogatepass')
+
+
+def lookup(entries: 'Sequence[IndexEntryFileName]', name: str, table: Optional[Dict[int, int]],
+           read_node: 'Callable[[int], Sequence[IndexEntryFileName]]') -> 'Optional[IndexEntryFileName]':
+    """
+    Find `name` in a directory index, descending from the `entries` of its root.
+
+    Parameters
+    ----------
+    entries : Sequence[IndexEntryFileName]
+        The entries of the $INDEX_ROOT, ending with the last entry.
+    name : str
+        The name to find, case-insensitively.
+    table : Dict[int, int], optional
+        See `upcase_table`.
+    read_node : Callable[[int], Sequence[IndexEntryFileName]]
+        Returns the entries of the index record at a VCN. Only the records on the
+        path to `name` are read.
+
+    Returns
+    -------
+    IndexEntryFileName
+        The entry of `name`, None if it is not in the index.
+    """
+    key = collate(name, table)
+    while True:
+        keys = [collate(e.filename.filename, table) for e in entries[:-1]]
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            return entries[i]
+        if not entries[i].child_exists:
+            return None
+        entries = read_node(entries[i].child_vcn)
@@ -0,0 +1,90 @@
+from .mft_attr import FileNameHeader
+from .file_ref import FileRef
+
+from typing import Any, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .file import File
+
+
+class DirEntry(object):
+    """
+    An entry of a directory listing, read from the $I30 index of the directory.
+
+    The name, sizes, flags and times are those of the $FILE_NAME copy kept in the
+    index, so listing a directory does not read the MFT entries of its children.
+    NTFS updates these copies lazily, so sizes and times may lag behind the MFT
+    entry of the file. Anything else, e.g. `data` or `fullpath`, is looked up on
+    `file`, which reads the MFT entry on first use.
+    """
+
+    __slots__ = ['fs', 'file_ref', 'filename', '_file']
+
+    def __init__(self, filesystem, file_ref: FileRef, filename: FileNameHeader):
+        self.fs = filesystem
+        self.file_ref = file_ref
+        self.filename = filename
+        self._file: 'Optional[File]' = None
+
+    @property
+    def inode(self) -> int:
+        return self.file_ref.inode
+
+    @property
+    def name(self) -> str:
+        return self.filename.filename
+
+    @property
+    def namespace(self) -> int:
+        return self.filename.namespace
+
+    @property
+    def size(self) -> int:
+        return self.filename.actual_size
+
+    @property
+    def allocated_size(self) -> int:
+        return self.filename.allocated_size
+
+    @property
+    def is_dir(self) -> bool:
+        return self.filename.flags & 0x10000000 != 0
+
+    @property
+    def is_file(self) -> bool:
+        return not self.is_dir
+
+    @property
+    def ctime(self) -> int:
+        return self.filename.ctime
+
+    @property
+    def atime(self) -> int:
+        return self.filename.atime
+
+    @property
+    def mtime(self) -> int:
+        return self.filename.mtime
+
+    @property
+    def rtime(self) -> int:
+        return self.filename.rtime
+
+    @property
+    def file(self) -> 'File':
+        """File: The file of this entry, read from the MFT on first use."""
+        if self._file is None:
+            self._file = self.fs.find(inode=self.inode)
+        return self._file
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.file, name)
+
+    def __str__(self):
+        return '{} {:>8} "{}" {}'.format('r' if self.is_file else 'd',
+                                         self.inode, self.name, self.size)
+
+    def __repr__(self):
+        return self.__str__()
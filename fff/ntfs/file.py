@@ -1,21 +1,26 @@
 from .mft_entry import MFTEntry
-from .mft_attr import FileName, Data, IndexAllocation, IndexRoot, MFTAttr
+from .mft_attr import FileName, Data, IndexAllocation, IndexEntryFileName, IndexRoot, MFTAttr
+from .dir_entry import DirEntry
+from .vcn import DataRun
+from .file_stream import FileStream
+from . import collation
 
 from ..entity import Entity
 from ..abstract_file import AbstractFile
-from .. import previewer
+from ..disk import Buffer
 
-from tabulate import tabulate
-import magic
-
-from typing import Optional, cast, List, Iterable, Sequence, Any, Pattern
+from typing import Optional, cast, Dict, List, Iterable, Sequence, Any, Pattern, Tuple, Union
 from itertools import chain
 import fnmatch
 import re
 from os import path
+import io
 
 
 class File(AbstractFile):
+
+    ZERO_BLOCK_SIZE = 1 << 20
+
     def __init__(self, mft_entry: MFTEntry, filesystem):
         super().__init__()
         self.fs = filesystem
@@ -46,7 +51,8 @@ class File(AbstractFile):
     @property
     def size(self) -> int:
         das = self.attrs(type_id='$DATA', name='')
-        return sum([da.header.actual_size for da in das])
+        return sum([da.header.actual_size if da.header.non_resident else da.header.attr_length
+                    for da in das])
 
     @property
     def allocated_size(self) -> int:
@@ -93,6 +99,8 @@ class File(AbstractFile):
 
     @property
     def mime(self) -> str:
+        import magic
+
         return magic.from_buffer(b''.join(self.read(count=261)), mime=True)
 
     @property
@@ -107,52 +115,195 @@ class File(AbstractFile):
         assert not (pattern and regex)
 
         if pattern:
-            regex = fnmatch.translate(pattern)
+            # A shell-style pattern matches whole names, as in `fnmatch`.
+            regex = r'\A' + fnmatch.translate(pattern)
         if regex:
             assert not _reobj
             _reobj = re.compile(regex)
+            if self.fs.mft.has_name_index:
+                yield from self._list_indexed(recursive, _reobj)
+                return
 
-        ir = self.mft_entry.attr(type_id='$INDEX_ROOT')
-        assert ir
-        ir = cast(IndexRoot, ir)
-        ias = self.mft_entry.attrs(type_id='$INDEX_ALLOCATION')
-
-        entries = chain(ir.entries,
-                        (e for ia in ias
-                         for r in cast(IndexAllocation, ia).records.values()
-                         for e in r.entries))
-
-        for e in entries:
+        for e in self._index_entries():
             if not e.is_last:
                 f = self.fs.find(inode=e.file_ref.inode)
                 if not _reobj or _reobj.search(f.name):
                     yield f
-                if f.is_dir and recursive and f.mft_entry.inode != self.mft_entry.inode:
+                # A directory with a DOS name has a second entry, walk it once.
+                if (f.is_dir and recursive and e.filename.namespace != 2 and
+                        f.mft_entry.inode != self.mft_entry.inode):
                     for sub in f.list(recursive=recursive, _reobj=_reobj):
                         if not _reobj or _reobj.search(sub.name):
                             yield sub
 
-    def read(self, count: int, skip: int = 0, bsize: int = 1) -> Iterable[bytes]:
+    def _index_entries(self) -> Iterable[IndexEntryFileName]:
+        ir = self.mft_entry.attr(type_id='$INDEX_ROOT', name='$I30')
+        assert ir
+        ir = cast(IndexRoot, ir)
+        # The first part of an attribute split over extension entries walks all parts.
+        ia = cast(Optional[IndexAllocation],
+                  self.mft_entry.attr(type_id='$INDEX_ALLOCATION', name='$I30'))
+        records = ia.records.values() if ia else []
+
+        return cast(Iterable[IndexEntryFileName],
+                    chain(ir.entries, (e for r in records for e in r.entries)))
+
+    def scandir(self, recursive: bool = False) -> Iterable[DirEntry]:
+        """Yields the entries of this directory, straight from its $I30 index.
+
+        Unlike `list`, the MFT entries of the children are not read, except those
+        of subdirectories when `recursive`. DOS names of files with a Win32 name
+        are skipped, so each file is listed once per parent.
+        """
+        if self.is_file:
+            return
+
+        for e in self._index_entries():
+            if e.is_last or e.filename.namespace == 2 or e.file_ref.inode == self.inode:
+                continue
+            entry = DirEntry(self.fs, e.file_ref, e.filename)
+            yield entry
+            if recursive and entry.is_dir:
+                yield from entry.file.scandir(recursive=True)
+
+    def child(self, name: str) -> 'Optional[File]':
+        """Returns the file `name` in this directory, None if there is none.
+
+        The name is looked up case-insensitively, like Windows does, by descending
+        the $I30 index in the collation order of the $UpCase table. Only the index
+        records on the way are read.
+        """
+        if self.is_file:
+            return None
+        ir = cast(IndexRoot, self.mft_entry.attr(type_id='$INDEX_ROOT', name='$I30'))
+        assert ir
+        ia = cast(Optional[IndexAllocation],
+                  self.mft_entry.attr(type_id='$INDEX_ALLOCATION', name='$I30'))
+
+        def read_node(vcn: int) -> List[IndexEntryFileName]:
+            assert ia, 'No $INDEX_ALLOCATION for VCN {}'.format(vcn)
+            return ia.record(vcn).entries
+
+        e = collation.lookup(cast(List[IndexEntryFileName], ir.entries), name, self.fs.upcase,
+                             read_node)
+        return self.fs.find(inode=e.file_ref.inode) if e else None
+
+    def _list_indexed(self, recursive: bool, reobj: Pattern) -> 'Iterable[File]':
+        """`list` through `mft.name_index`, reading only the MFT entries of matches.
+
+        Yields the same files as a scan of the $I30 indexes, i.e. one per index
+        entry, DOS names included, maybe in another order. Any name with children
+        in the name index is a directory, as listing a directory without any
+        yields nothing.
+        """
+        index = self.fs.mft.name_index
+        matches: Dict[int, bool] = {}
+
+        def walk(inode: int) -> Iterable[int]:
+            for n in index.children.get(inode, []):
+                if n.inode not in matches:
+                    matches[n.inode] = bool(reobj.search(index.display_name(n.inode)))
+                if matches[n.inode]:
+                    yield n.inode
+                if recursive and n.namespace != 2 and n.inode != inode:
+                    yield from walk(n.inode)
+
+        for i in walk(self.mft_entry.inode):
+            yield self.fs.find(inode=i)
+
+    def _resident_data(self) -> Optional[bytes]:
+        """The data of the file if it is resident, i.e. kept in its MFT entry."""
+        da = cast(Optional[Data], self.attr(type_id='$DATA', name=''))
+        return da.data if da is not None and not da.header.non_resident else None
+
+    def _data_runs(self) -> Iterable[DataRun]:
+        attrs = self.attrs(type_id='$DATA', name='')
+        data_attrs = cast(List[Data], attrs)
+        return (dr for data_attr in data_attrs for dr in data_attr.header.vcn.drs)
+
+    def read(self, count: int, skip: int = 0, bsize: int = 1) -> Iterable[Buffer]:
+        """Read file data. See `AbstractFile.read`.
+
+        Chunks are yielded as the disk returns them, i.e. as `memoryview` slices of
+        a memory-mapped image, without copying. Sparse runs are synthesized as
+        zeros, in blocks of at most `ZERO_BLOCK_SIZE` bytes, without reading the disk.
+        Resident data is yielded from the MFT entry.
+        """
         cluster_size = self.fs.cluster_size
         skip *= bsize
 
+        resident = self._resident_data()
+        if resident is not None:
+            if count * bsize > 0 and skip < len(resident):
+                yield resident[skip:skip+count*bsize]
+            return
+
+        zeros: Optional[memoryview] = None
         bytes_left = count * bsize
-        attrs = self.attrs(type_id='$DATA', name='')
-        data_attrs = cast(List[Data], attrs)
-        for dr in [dr for data_attr in data_attrs for dr in data_attr.header.vcn.drs]:
+        for dr in self._data_runs():
+            if bytes_left <= 0:
+                break
             consec_size = dr.length * cluster_size
             if skip >= consec_size:
                 skip -= consec_size
+                continue
+            to_read = min(consec_size - skip, bytes_left)
+            bytes_left -= to_read
+            if dr.offset is None:
+                if zeros is None or len(zeros) < min(to_read, File.ZERO_BLOCK_SIZE):
+                    zeros = memoryview(bytes(min(to_read, File.ZERO_BLOCK_SIZE)))
+                while to_read > 0:
+                    n = min(to_read, File.ZERO_BLOCK_SIZE)
+                    yield zeros[:n]
+                    to_read -= n
             else:
-                to_read = min(skip + bytes_left, consec_size)
-                bytes_left = bytes_left - to_read + skip
-                yield self.fs.read(offset=dr.offset * self.fs.cluster_size, size=to_read)[skip:]
+                yield self.fs.read(offset=dr.offset * cluster_size + skip, size=to_read)
+            skip = 0
+
+    def open(self, buffering: int = io.DEFAULT_BUFFER_SIZE) -> 'Union[io.BufferedReader, FileStream]':
+        """Open the file data as a seekable, read-only binary stream.
+
+        Parameters
+        ----------
+        buffering : int
+            The buffer size of the returned `io.BufferedReader`. With 0, the
+            unbuffered `FileStream` is returned.
+
+        Examples
+        --------
+        >>> hashlib.sha256(f.open().read()).hexdigest()
+        >>> zipfile.ZipFile(f.open()).namelist()
+        """
+        stream = FileStream(self)
+        if buffering == 0:
+            return stream
+        return io.BufferedReader(stream, buffering)
+
+    def extents(self) -> Iterable[Tuple[int, int, int]]:
+        """Yields the allocated extents of the file data, skipping sparse runs.
+
+        Returns
+        -------
+        Iterable[Tuple[int, int, int]]
+            `(offset, location, size)` in bytes, where `offset` is in the file and
+            `location` on the filesystem, e.g. for `NTFS.read`. Extents end at the
+            file size, so slack space is excluded. Resident data, kept in the MFT
+            entry, has none.
+        """
+        cluster_size = self.fs.cluster_size
+        size = self.size
+        offset = 0
+        for dr in self._data_runs():
+            if offset >= size:
+                break
+            length = min(dr.length * cluster_size, size - offset)
+            if dr.offset is not None:
+                yield offset, dr.offset * cluster_size, length
+            offset += length
 
     def contains(self, cluster: int) -> bool:
-        attrs = self.attrs(type_id='$DATA', name='')
-        data_attrs = cast(List[Data], attrs)
-        for dr in [dr for data_attr in data_attrs for dr in data_attr.header.vcn.drs]:
-            if not dr.offset:
+        for dr in self._data_runs():
+            if dr.offset is None:
                 continue
             if cluster >= dr.offset and cluster < dr.offset + dr.length:
                 return True
@@ -166,6 +317,8 @@ class File(AbstractFile):
                 ['Allocated Size', self.allocated_size], ]
 
     def preview(self):
+        from .. import previewer
+
         previewer.preview(self)
 
     def __str__(self):
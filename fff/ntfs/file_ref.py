@@ -1,7 +1,6 @@
-from tabulate import tabulate
-
-
 class FileRef(object):
+    __slots__ = ['inode', 'seq']
+
     def __init__(self, data: bytes):
         assert len(data) == 8
         self.inode = int.from_bytes(data[:5], byteorder='little')
@@ -0,0 +1,107 @@
+from array import array
+from bisect import bisect_right
+from typing import List, Optional, TYPE_CHECKING
+import io
+
+if TYPE_CHECKING:
+    from .file import File
+
+
+class FileStream(io.RawIOBase):
+    """
+    A seekable, read-only stream of the data of an NTFS file. See `File.open`.
+
+    The data runs are indexed by their offset in the file, so a seek is free and
+    a read finds its first run with a binary search. Sparse runs read as zeros.
+    Resident data is read from the MFT entry.
+
+    Parameters
+    ----------
+    file : File
+        The file to read.
+    """
+
+    def __init__(self, file: 'File'):
+        super().__init__()
+        self.file = file
+        self.size = file.size
+
+        cluster_size = file.fs.cluster_size
+        self._resident = file._resident_data()
+        self._starts = array('q')
+        self._locations: List[Optional[int]] = []
+        offset = len(self._resident) if self._resident is not None else 0
+        for dr in file._data_runs():
+            if offset >= self.size:
+                break
+            self._starts.append(offset)
+            self._locations.append(None if dr.offset is None else dr.offset * cluster_size)
+            offset += dr.length * cluster_size
+        # Data beyond the runs, if any, is not readable.
+        self._end = min(offset, self.size)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        self._check_open()
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        self._check_open()
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError('invalid whence ({})'.format(whence))
+        if pos < 0:
+            raise ValueError('negative seek position {}'.format(pos))
+        self._pos = pos
+        return pos
+
+    def readinto(self, b) -> int:
+        self._check_open()
+        out = memoryview(b).cast('B')
+        n = max(0, min(len(out), self._end - self._pos))
+        if self._resident is not None:
+            out[:n] = self._resident[self._pos:self._pos+n]
+            self._pos += n
+            return n
+        done = 0
+        i = bisect_right(self._starts, self._pos) - 1
+        while done < n:
+            pos = self._pos + done
+            run_end = self._starts[i + 1] if i + 1 < len(self._starts) else self._end
+            size = min(run_end - pos, n - done)
+            location = self._locations[i]
+            if location is None:
+                out[done:done+size] = bytes(size)
+            else:
+                out[done:done+size] = self.file.fs.read(size=size,
+                                                        offset=location + pos - self._starts[i])
+            done += size
+            i += 1
+        self._pos += n
+        return n
+
+    def readall(self) -> bytes:
+        b = bytearray(max(0, self._end - self.tell()))
+        n = self.readinto(b)
+        return bytes(b[:n])
+
+    def _check_open(self):
+        if self.closed:
+            raise ValueError('I/O operation on closed file.')
+
+    def __str__(self):
+        return '<FileStream "{}" {}/{}>'.format(self.file.name, self._pos, self.size)
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,92 @@
+"""Update sequence arrays ("fixups") of multi-sector records, i.e. MFT entries and
+index records.
+
+When a record is written, the last two bytes of each of its 512-byte strides are
+saved in the update sequence array and replaced by the update sequence number.
+They have to be put back before the record is parsed, and a stride not ending
+with the update sequence number was not written with the rest of the record.
+"""
+from typing import List
+import struct
+
+
+STRIDE = 512
+
+# Below this many records, NumPy costs more than it saves.
+VECTORIZE_MIN_RECORDS = 8
+
+
+def apply_fixups(buf: bytearray, record_size: int) -> List[int]:
+    """
+    Apply the update sequence arrays of all records in `buf`, in place.
+
+    Records without a well-formed update sequence array, e.g. unused MFT entries,
+    are left as they are.
+
+    Parameters
+    ----------
+    buf : bytearray
+        Consecutive records of `record_size` bytes. A trailing partial record is
+        ignored.
+    record_size : int
+        The size of a record, a multiple of 512.
+
+    Returns
+    -------
+    List[int]
+        The indices of the records whose strides do not all end with the update
+        sequence number, e.g. torn writes. These records are left as they are.
+    """
+    n = len(buf) // record_size
+    if n >= VECTORIZE_MIN_RECORDS:
+        try:
+            import numpy  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            return _apply_numpy(buf, record_size)
+    return _apply_python(buf, record_size)
+
+
+def _apply_python(buf: bytearray, record_size: int) -> List[int]:
+    strides = record_size // STRIDE
+    bad = []
+    for i in range(len(buf) // record_size):
+        base = i * record_size
+        offset, count = struct.unpack_from('<HH', buf, base + 4)
+        if count != strides + 1 or offset < 8 or offset + 2 * count > record_size:
+            continue
+        usa = base + offset
+        usn = buf[usa:usa+2]
+        ends = range(base + STRIDE - 2, base + record_size, STRIDE)
+        if any(buf[e:e+2] != usn for e in ends):
+            bad.append(i)
+            continue
+        for j, e in enumerate(ends):
+            buf[e:e+2] = buf[usa+2+2*j:usa+4+2*j]
+    return bad
+
+
+def _apply_numpy(buf: bytearray, record_size: int) -> List[int]:
+    import numpy as np
+
+    strides = record_size // STRIDE
+    n = len(buf) // record_size
+    a = np.frombuffer(buf, dtype=np.uint8, count=n * record_size).reshape(n, record_size)
+
+    offset = a[:, 4].astype(np.int64) | a[:, 5].astype(np.int64) << 8
+    count = a[:, 6].astype(np.int64) | a[:, 7].astype(np.int64) << 8
+    rows = np.nonzero((count == strides + 1) & (offset >= 8) &
+                      (offset + 2 * count <= record_size))[0]
+    usa = offset[rows]
+
+    # One row per record, one column per stride.
+    ends = np.arange(1, strides + 1) * STRIDE - 2
+    r = rows[:, None]
+    ok = ((a[r, ends] == a[rows, usa][:, None]) &
+          (a[r, ends + 1] == a[rows, usa + 1][:, None])).all(axis=1)
+
+    r, saved = r[ok], usa[ok][:, None] + 2 + 2 * np.arange(strides)
+    a[r, ends] = a[r, saved]
+    a[r, ends + 1] = a[r, saved + 1]
+    return rows[~ok].tolist()
@@ -0,0 +1,111 @@
+from .name_index import Name, NameIndex
+from .cluster_index import Allocation, ClusterIndex
+
+from typing import Iterable, Optional, TYPE_CHECKING
+import threading
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+class MetadataStore(object):
+    """
+    A SQLite database of the indexes built by a pass over a whole MFT, i.e. the
+    names and parent links of `NameIndex` and the data runs of `ClusterIndex`,
+    so they are built once per volume instead of once per open.
+
+    Volumes are identified by `NTFS.volume_key`. An index is stored in a single
+    transaction, so an interrupted save leaves no partial index behind.
+
+    Parameters
+    ----------
+    path : str
+        The path of the database, created on first use.
+    """
+
+    VERSION = 1
+
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS indexes '
+        '(volume TEXT, kind TEXT, version INTEGER, PRIMARY KEY (volume, kind))',
+        'CREATE TABLE IF NOT EXISTS names '
+        '(volume TEXT, name TEXT, inode INTEGER, parent INTEGER, namespace INTEGER)',
+        'CREATE INDEX IF NOT EXISTS names_volume ON names (volume)',
+        'CREATE TABLE IF NOT EXISTS allocations '
+        '(volume TEXT, lcn INTEGER, length INTEGER, inode INTEGER, type_id INTEGER, '
+        'name TEXT, vcn INTEGER)',
+        'CREATE INDEX IF NOT EXISTS allocations_volume ON allocations (volume)',
+    ]
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db: 'Optional[sqlite3.Connection]' = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> 'sqlite3.Connection':
+        if self._db is None:
+            import sqlite3
+
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            with self._db:
+                for statement in MetadataStore.SCHEMA:
+                    self._db.execute(statement)
+        return self._db
+
+    def _has(self, volume: str, kind: str) -> bool:
+        row = self._connect().execute(
+            'SELECT version FROM indexes WHERE volume = ? AND kind = ?', (volume, kind)).fetchone()
+        return row is not None and row[0] == MetadataStore.VERSION
+
+    def _save(self, volume: str, kind: str, table: str, columns: int, rows: Iterable[tuple]):
+        db = self._connect()
+        with db:
+            db.execute('DELETE FROM indexes WHERE volume = ? AND kind = ?', (volume, kind))
+            db.execute('DELETE FROM {} WHERE volume = ?'.format(table), (volume,))
+            db.executemany('INSERT INTO {} VALUES (?, {})'.format(table, ', '.join('?' * columns)),
+                           ((volume,) + tuple(r) for r in rows))
+            db.execute('INSERT INTO indexes VALUES (?, ?, ?)',
+                       (volume, kind, MetadataStore.VERSION))
+
+    def load_names(self, volume: str) -> Optional[NameIndex]:
+        """Returns the stored name index of `volume`, None if there is none."""
+        with self._lock:
+            if not self._has(volume, 'names'):
+                return None
+            index = NameIndex()
+            for row in self._connect().execute(
+                    'SELECT name, inode, parent, namespace FROM names '
+                    'WHERE volume = ? ORDER BY rowid', (volume,)):
+                index.add(Name(*row))
+            return index
+
+    def save_names(self, volume: str, index: NameIndex):
+        with self._lock:
+            self._save(volume, 'names', 'names', len(Name._fields), index)
+
+    def load_clusters(self, volume: str) -> Optional[ClusterIndex]:
+        """Returns the stored cluster index of `volume`, None if there is none."""
+        with self._lock:
+            if not self._has(volume, 'clusters'):
+                return None
+            rows = self._connect().execute(
+                'SELECT lcn, length, inode, type_id, name, vcn FROM allocations '
+                'WHERE volume = ?', (volume,))
+            return ClusterIndex(Allocation(*row) for row in rows)
+
+    def save_clusters(self, volume: str, index: ClusterIndex):
+        with self._lock:
+            self._save(volume, 'clusters', 'allocations', len(Allocation._fields),
+                       index.allocations)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __str__(self):
+        return '<MetadataStore "{}">'.format(self.path)
+
+    def __repr__(self):
+        return self.__str__()
@@ -1,45 +1,185 @@
 from .file import File
 from .mft_entry import MFTEntry
-from .mft_attr import FileName
+from .name_index import NameIndex
+from .cluster_index import ClusterIndex
+from .fixup import apply_fixups
 
-from typing import cast, Optional
+from ..object_cache import ObjectCache
+
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+import threading
 
 
 class MFT(File):
-    def __init__(self, filesystem, data: bytes):
+    """
+    The $MFT file, i.e. the table of all MFT entries of a filesystem.
+
+    Entries are located through the data runs of $MFT and read on demand, a window
+    of consecutive entries at a time. The most recently used windows are kept, so
+    memory use is bounded by `window_size * window_count` regardless of the size
+    of $MFT.
+
+    Parameters
+    ----------
+    filesystem : NTFS
+        The filesystem.
+    data : bytes
+        The MFT entry of $MFT itself.
+    window_size : int
+        The number of bytes read at a time, rounded down to whole MFT entries.
+    window_count : int
+        The number of windows to keep. With 0, only the requested entry is read.
+    entry_cache_size : int
+        The number of parsed `MFTEntry` objects kept in `entries`.
+
+    Attributes
+    ----------
+    torn : Set[int]
+        The inodes of the entries read so far whose update sequence did not match,
+        e.g. torn writes. Their fixups are not applied.
+    workers : int
+        The number of processes parsing all entries for `name_index`,
+        `cluster_index` and `table`.
+        0, the default, parses them in this process. Workers open the image again,
+        so this only applies to filesystems opened through a `DiskImage` that is
+        `reopenable`.
+    """
+
+    DEFAULT_WINDOW_SIZE = 256 << 10
+    DEFAULT_WINDOW_COUNT = 16
+    DEFAULT_ENTRY_CACHE_SIZE = 4096
+
+    def __init__(self, filesystem, data: bytes, window_size: int = DEFAULT_WINDOW_SIZE,
+                 window_count: int = DEFAULT_WINDOW_COUNT,
+                 entry_cache_size: int = DEFAULT_ENTRY_CACHE_SIZE):
         mft_entry = MFTEntry(data, filesystem.dv, 0)
         File.__init__(self, mft_entry, filesystem)
 
-        self.entries = {0: self.mft_entry}
-        self._data = None
+        self.entries = ObjectCache(entry_cache_size)
+        self.entries.put(0, self.mft_entry)
+
+        self.record_size: int = filesystem.boot_sector.file_record_size
+        self.entry_total: int = self.size // self.record_size
+
+        self.window_size = max(1, window_size // self.record_size) * self.record_size
+        self.window_count = window_count
+        self._windows: 'OrderedDict[int, memoryview]' = OrderedDict()
+        # The most recently used window, read without taking the lock.
+        self._last: Tuple[int, Optional[memoryview]] = (-1, None)
+        self._lock = threading.Lock()
+        self._name_index: Optional[NameIndex] = None
+        self._cluster_index: Optional[ClusterIndex] = None
+        self.workers = 0
+        self.torn: Set[int] = set()
+
+    def _window(self, index: int) -> memoryview:
+        with self._lock:
+            window = self._windows.get(index)
+            if window is not None:
+                self._windows.move_to_end(index)
+                self._last = (index, window)
+                return window
+
+        # The buffer the window is gathered into is fixed up in place and kept as is.
+        data = bytearray().join(self.read(count=self.window_size, skip=index * self.window_size))
+        first = index * self.window_size // self.record_size
+        bad = apply_fixups(data, self.record_size)
+        window = memoryview(data).toreadonly()
+
+        with self._lock:
+            self.torn.update(first + i for i in bad)
+            self._windows[index] = window
+            while len(self._windows) > self.window_count:
+                self._windows.popitem(last=False)
+            self._last = (index, window)
+        return window
+
+    def record(self, inode: int) -> bytes:
+        """Returns the raw MFT entry of `inode`.
+
+        The entry is copied out of its window, so it does not keep the window alive
+        once the window is dropped.
+        """
+        if inode >= self.entry_total:
+            raise Exception('inode too large')
 
-        mft_clusters: int = self.size // filesystem.cluster_size
-        self.entry_total: int = mft_clusters // filesystem.boot_sector.cluster_per_file_record_segment
+        rs = self.record_size
+        if self.window_count <= 0:
+            data = bytearray().join(self.read(count=rs, skip=inode * rs))
+            if apply_fixups(data, rs):
+                with self._lock:
+                    self.torn.add(inode)
+            return bytes(data)
+
+        offset = inode * rs
+        index, window = self._last
+        if index != offset // self.window_size or window is None:
+            window = self._window(offset // self.window_size)
+        begin = offset % self.window_size
+        return bytes(window[begin:begin+rs])
+
+    def clear(self):
+        """Drop the cached windows of MFT entries."""
+        with self._lock:
+            self._windows.clear()
+            self._last = (-1, None)
+
+    def table(self, chunk_size: int = 4 << 20, workers: Optional[int] = None):
+        """Parse all MFT entries into an `MFTTable`, a NumPy structured array.
+
+        This requires NumPy. `workers` defaults to `self.workers`.
+        """
+        from .mft_table import MFTTable
+
+        return MFTTable.build(self, chunk_size, self.workers if workers is None else workers)
+
+    @property
+    def name_index(self) -> NameIndex:
+        """NameIndex: The index of all file names, built on first use.
+
+        It is loaded from, or saved to, the `MetadataStore` of the image if any.
+        """
+        if self._name_index is None:
+            store = self.fs.metadata
+            index = store.load_names(self.fs.volume_key) if store else None
+            if index is None:
+                index = NameIndex.build(self, self.workers)
+                if store:
+                    store.save_names(self.fs.volume_key, index)
+            self._name_index = index
+        return self._name_index
+
+    @property
+    def has_name_index(self) -> bool:
+        return self._name_index is not None
 
     @property
-    def data(self):
-        if self._data is None:
-            self._data = b''.join(self.read(count=self.size))
-        return self._data
-
-    def find(self, name: Optional[str] = None, inode: Optional[int] = None) -> Optional[MFTEntry]:
-        bs = self.fs.cluster_size
-        data = self.data
+    def cluster_index(self) -> ClusterIndex:
+        """ClusterIndex: The index of the clusters of all files, built on first use.
+
+        It is loaded from, or saved to, the `MetadataStore` of the image if any.
+        """
+        if self._cluster_index is None:
+            store = self.fs.metadata
+            index = store.load_clusters(self.fs.volume_key) if store else None
+            if index is None:
+                index = ClusterIndex.build(self, self.workers)
+                if store:
+                    store.save_clusters(self.fs.volume_key, index)
+            self._cluster_index = index
+        return self._cluster_index
+
+    def find(self, name: Optional[str] = None, inode: Optional[int] = None,
+             case_sensitive: bool = True) -> Optional[MFTEntry]:
         if name is not None:
-            for i in range(1, len(data) // bs):
-                e = MFTEntry(data[i*bs:(i+1)*bs], self.fs, i, self)
-                self.entries[i] = e
-                for fn in e.attrs(type_id='$FILE_NAME'):
-                    fn = cast(FileName, fn)
-                    if fn.filename == name:
-                        return e
+            names = self.name_index.find(name, case_sensitive=case_sensitive)
+            if not names:
+                return None
+            return self.find(inode=min(n.inode for n in names))
         elif inode is not None:
-            if inode >= len(data) // bs:
-                raise Exception('inode too large')
-            if inode in self.entries:
-                return self.entries[inode]
-            else:
-                e = MFTEntry(data[inode*bs:(inode+1)*bs], self.fs, inode, self)
-                self.entries[inode] = e
-                return e
+            e = self.entries.get(inode)
+            if e is None:
+                e = self.entries.put(inode, MFTEntry(self.record(inode), self.fs, inode, self))
+            return e
         return None
@@ -1,13 +1,11 @@
 from .vcn import parse_data_runs, VCN
 from .file_ref import FileRef
+from .fixup import apply_fixups
 from ..disk_view import DiskView
 
-from tabulate import tabulate
-from hexdump import hexdump
-
 import struct
 from datetime import datetime, timedelta
-from typing import List, Any, Callable, Dict, Sequence, Tuple, Optional, cast, TYPE_CHECKING
+from typing import List, Any, Callable, Dict, Sequence, Tuple, Optional, Set, cast, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from .mft_entry import MFTEntry
@@ -63,6 +61,7 @@ class MFTAttr(object):
         return self.header.tabulate()
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate())
 
     def __repr__(self):
@@ -70,7 +69,13 @@ class MFTAttr(object):
 
 
 class AttrHeader(object):
-    def __init__(self, data: bytes, offset: int):
+    __slots__ = ['offset', 'type_id', 'size', 'non_resident', 'name_length', 'name_offset', 'flags',
+                 'attr_id', 'name', 'raw', 'starting_vcn', 'last_vcn', 'offset_dataruns',
+                 'compression_unit_size', 'padding', 'allocated_size', 'actual_size',
+                 'compressed_size', 'vcn', 'attr_length', 'attr_offset', 'index_flag']
+
+    def __init__(self, data: bytes, offset: int, keep_raw: bool = False):
+        self.offset = offset
         self.type_id = struct.unpack('<I', data[offset:offset+4])[0]
         self.size = struct.unpack('<I', data[offset+4:offset+8])[0]
         assert offset + self.size <= len(data), ('offset: {}, size: {}, len: {}'.format(
@@ -82,10 +87,11 @@ class AttrHeader(object):
         self.attr_id = struct.unpack('<H', data[offset+14:offset+16])[0]
 
         name_offset = offset + self.name_offset
-        self.name = data[name_offset:name_offset+self.name_length*2].decode()
+        self.name = bytes(data[name_offset:name_offset+self.name_length*2]).decode('utf-16-le')
         of = name_offset + self.name_length * 2
 
-        self.raw = data[offset:offset+self.size]
+        # The bytes of the attribute are only copied on request, parsers use the entry.
+        self.raw: Optional[bytes] = bytes(data[offset:offset+self.size]) if keep_raw else None
 
         if self.non_resident:
             self.starting_vcn = struct.unpack('<Q', data[offset+0x10:offset+0x18])[0]
@@ -147,6 +153,7 @@ class AttrHeader(object):
         return r
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate())
 
     def __repr__(self):
@@ -252,6 +259,9 @@ FLAGS = {
 
 
 class FileNameHeader(object):
+    __slots__ = ['parent', 'ctime', 'atime', 'mtime', 'rtime', 'allocated_size', 'actual_size',
+                 'flags', 'er', 'name_length', 'namespace', 'filename']
+
     def __init__(self, data: bytes, offset: int, **kwargs):
         super().__init__()
 
@@ -266,7 +276,7 @@ class FileNameHeader(object):
         self.er = struct.unpack('<I', data[offset+60:offset+64])[0]
         self.name_length = struct.unpack('<B', data[offset+64:offset+65])[0]
         self.namespace = struct.unpack('<B', data[offset+65:offset+66])[0]
-        self.filename = data[offset+66:offset+66+self.name_length*2].decode('utf-16')
+        self.filename = bytes(data[offset+66:offset+66+self.name_length*2]).decode('utf-16')
 
     @property
     def flags_s(self) -> str:
@@ -317,7 +327,7 @@ class FileName(MFTAttr):
         self.er = struct.unpack('<I', rdata[60:64])[0]
         self.name_length = struct.unpack('<B', rdata[64:65])[0]
         self.namespace = struct.unpack('<B', rdata[65:66])[0]
-        self.filename = rdata[66:66+self.name_length*2].decode('utf-16')
+        self.filename = bytes(rdata[66:66+self.name_length*2]).decode('utf-16')
 
     @property
     def flags_s(self) -> str:
@@ -356,10 +366,10 @@ class Data(MFTAttr):
         super().__init__(header)
 
         if header.non_resident:
-            self.data = rdata
-        else:
             assert nrdata is None, 'Don\'t parse non-resident data.'
             self.data = None
+        else:
+            self.data = rdata
 
     @property
     def vcn(self):
@@ -386,6 +396,7 @@ class IndexNodeHeader(object):
                 ['Flag', self.flag], ]
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate())
 
     def __repr__(self):
@@ -393,6 +404,8 @@ class IndexNodeHeader(object):
 
 
 class IndexEntry(object):
+    __slots__ = ['file_ref', 'entry_size', 'content_size', 'flags']
+
     FLAGS = {1: 'Child node exists',
              2: 'Last entry in list', }
     SIZE = 0x10
@@ -431,6 +444,8 @@ class IndexEntry(object):
 
 
 class IndexEntryFileName(IndexEntry):
+    __slots__ = ['filename', 'child_vcn']
+
     def __init__(self, data: bytes, offset: int):
         super().__init__(data, offset)
         of = offset + IndexEntry.SIZE
@@ -499,13 +514,14 @@ class IndexRecord(object):
 
     def tabulate(self):
         return ([['----', '----'],
-                 ['Signature', '{} ({})'.format(self.signature.decode(), self.signature)],
+                 ['Signature', '{} ({})'.format(bytes(self.signature).decode(), bytes(self.signature))],
                  ['LSN', self.lsn],
                  ['VCN', self.vcn],
                  ['#entries', len(self.entries)], ] +
                 [t for e in self.entries for t in e.tabulate()])
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate())
 
     def __repr__(self):
@@ -514,26 +530,112 @@ class IndexRecord(object):
 
 @MFTAttribute(0x0A0, '$INDEX_ALLOCATION')
 class IndexAllocation(MFTAttr):
+    """
+    The index records below the $INDEX_ROOT of the same name.
+
+    Records are read one VCN at a time through the data runs of the attribute,
+    when first used, and kept. `records` walks the whole tree. An attribute split
+    over extension entries reads the VCNs of any of its parts.
+
+    Attributes
+    ----------
+    torn : Set[int]
+        The VCNs of the records read so far whose update sequence did not match,
+        e.g. torn writes. Their fixups are not applied.
+    """
+
     def __init__(self, entry: 'MFTEntry', header: AttrHeader,
                  rdata: Optional[bytes], nrdata: Optional[bytes]):
         assert header.non_resident
-        assert nrdata
 
         super().__init__(header)
 
-        ir = entry.attr(type_id=0x90)
-        assert ir
+        self.entry = entry
+        self._records: Dict[int, IndexRecord] = {}
+        self._tree: Optional[Dict[int, IndexRecord]] = None
+        self.torn: Set[int] = set()
 
+    def _base(self) -> 'MFTEntry':
+        e = self.entry
+        if e.base_ref.inode != 0 and e.mft is not None:
+            base = e.mft.find(inode=e.base_ref.inode)
+            assert base
+            return base
+        return e
+
+    @property
+    def root(self) -> IndexRoot:
+        ir = self._base().attr(type_id=0x90, name=self.header.name)
         assert ir, 'There should be 1 and only 1 $INDEX_ROOT but got none'
-        ir = cast(IndexRoot, ir)
-        self.records: Dict[int, IndexRecord] = {}
-        queue = list([cast(IndexEntryFileName, e).child_vcn
-                      for e in ir.entries if e.child_exists])
+        return cast(IndexRoot, ir)
 
-        while queue:
-            vcn = queue.pop()
-            # FIXME: Hard-coded cluster size
-            self.records[vcn] = IndexRecord(nrdata, vcn * 1024)
+    @property
+    def record_size(self) -> int:
+        return self.root.bytes_per_index_record
+
+    def _part(self, cluster: int) -> AttrHeader:
+        """The header of the part of this attribute mapping VCN `cluster`."""
+        h = self.header
+        if h.starting_vcn <= cluster <= h.last_vcn:
+            return h
+        base = self._base()
+        for e in [base] + base.extensions_with(self.header.type_id, self.header.name):
+            for h in e.headers:
+                if (h.type_id == self.header.type_id and h.name == self.header.name and
+                        h.starting_vcn <= cluster <= h.last_vcn):
+                    return h
+        raise IndexError('VCN {} is not in {}'.format(cluster, self.header.name))
+
+    def record(self, vcn: int) -> IndexRecord:
+        """Returns the index record at `vcn`, reading it on first use.
+
+        A record whose update sequence does not match is added to `torn`. Raises
+        `ValueError` if the record is in a sparse run.
+        """
+        r = self._records.get(vcn)
+        if r is not None:
+            return r
+
+        dv = self.entry.dv
+        size = self.record_size
+        cluster_size = dv.cluster_size
+        # Records smaller than a cluster are addressed in 512-byte units.
+        offset = vcn * (cluster_size if size >= cluster_size else 512)
+        first = offset // cluster_size
+        count = (offset % cluster_size + size + cluster_size - 1) // cluster_size
+
+        h = self._part(first)
+        begin = first - h.starting_vcn
+        data = bytearray()
+        for x in h.vcn.extents(begin, begin + count):
+            if x.lcn is None:
+                raise ValueError('Sparse index record at VCN {}'.format(vcn))
+            data += dv.read(size=x.length * cluster_size, offset=x.lcn * cluster_size)
+        skip = offset % cluster_size
+        data = data[skip:skip+size]
+        if apply_fixups(data, size):
+            self.torn.add(vcn)
+
+        r = IndexRecord(bytes(data), 0)
+        self._records[vcn] = r
+        return r
+
+    @property
+    def records(self) -> Dict[int, IndexRecord]:
+        """Dict[int, IndexRecord]: All records of the tree by VCN, read on first use."""
+        if self._tree is None:
+            tree: Dict[int, IndexRecord] = {}
+            todo = [cast(IndexEntryFileName, e).child_vcn
+                    for e in reversed(self.root.entries) if e.child_exists]
+            while todo:
+                vcn = todo.pop()
+                if vcn in tree:
+                    continue
+                r = self.record(vcn)
+                tree[vcn] = r
+                todo += [e.child_vcn for e in reversed(r.entries) if e.child_exists]
+            self._tree = tree
+        return self._tree
 
     def tabulate(self):
         return (self.header.tabulate() +
@@ -560,14 +662,17 @@ class Bitmap(MFTAttr):
 
 
 class AttributeEntry(object):
+    __slots__ = ['attr_type', 'entry_size', 'name_size', 'name_offset', 'starting_vcn',
+                 'attr_id', 'file_ref', 'name']
+
     def __init__(self, data, offset):
         (self.attr_type, self.entry_size, self.name_size, self.name_offset,
          self.starting_vcn, _, self.attr_id) = struct.unpack('<IHBBQQB', data[offset:offset+25])
         self.file_ref = FileRef(data[offset+16:offset+24])
 
         name_begin = offset + self.name_offset
-        name_end = name_begin + self.name_size
-        self.name = data[name_begin:name_end]
+        name_end = name_begin + self.name_size * 2
+        self.name = bytes(data[name_begin:name_end]).decode('utf-16-le')
 
     def tabulate(self):
         return [['Attribute Type', self.attr_type],
@@ -575,9 +680,10 @@ class AttributeEntry(object):
                 ['Starting VCN', self.starting_vcn],
                 ['Attribute ID', self.attr_id],
                 ['File Ref', self.file_ref],
-                ['Name', self.name.decode()], ]
+                ['Name', self.name], ]
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate())
 
     def __repr__(self):
@@ -595,9 +701,10 @@ class AttributeList(MFTAttr):
         else:
             data = nrdata
 
+        size = header.actual_size if header.non_resident else header.attr_length
         self.entries: List[AttributeEntry] = []
         of = 0
-        while of < header.actual_size:
+        while of < size:
             ae = AttributeEntry(data, of)
             of += ae.entry_size
             self.entries.append(ae)
@@ -1,18 +1,20 @@
-from .mft_attr import AttrHeader, AttributeList, MFTAttr
+from .mft_attr import AttrHeader, AttributeList, MFTAttr, TYPES
 from .file_ref import FileRef
 from ..disk_view import DiskView
 
-from tabulate import tabulate
-from hexdump import hexdump
-
 import struct
-from typing import List, Union, Optional, TYPE_CHECKING, cast, Dict
+from typing import List, Union, Optional, TYPE_CHECKING, cast, Dict, Set
 
 if TYPE_CHECKING:
     from .mft import MFT
 
 
 class MFTEntry(object):
+    __slots__ = ['raw', 'inode', 'sig', 'offset_fixup', 'fixup_entry_count', 'lsn', 'seq',
+                 'link_count', 'attr_offset', 'flags', 'used_size', 'alloc_size', 'base_ref',
+                 'next_attr_id', 'dv', 'mft', '_headers', '_decoded', '_extensions',
+                 '__weakref__']
+
     def __init__(self, data, dv: DiskView, inode: int, mft: 'Optional[MFT]' = None):
         self.raw = data
 
@@ -31,57 +33,106 @@ class MFTEntry(object):
         self.base_ref = FileRef(data[32:40])
         self.next_attr_id = struct.unpack('<H', data[40:42])[0]
 
+        self.dv = dv
+        self.mft = mft
+
         if not self.in_use:
             return
 
+        # Only headers are decoded here, attribute bodies are decoded by `attrs`.
         headers: List[AttrHeader] = []
         offset = self.attr_offset
-        offmap: Dict[AttrHeader, int] = {}
         while self.raw[offset:offset+4] != b'\xFF' * 4:
             h = AttrHeader(self.raw, offset)
             headers.append(h)
-            offmap[h] = offset
             offset += h.size
+        self._headers = sorted(headers, key=lambda h: h.type_id)
+        self._decoded: Dict[int, MFTAttr] = {}
+        self._extensions: 'Dict[int, MFTEntry]' = {}
+
+    def _decode(self, i: int) -> MFTAttr:
+        attr = self._decoded.get(i)
+        if attr is not None:
+            return attr
+
+        h = self._headers[i]
+        rdata: Optional[bytes] = None
+        if not h.non_resident:
+            of = h.offset + h.attr_offset
+            rdata = self.raw[of:of+h.attr_length]
+
+        nrdata: Optional[bytes] = None
+        # $DATA and $INDEX_ALLOCATION read their clusters themselves, on demand.
+        if h.type_id not in (0x080, 0x0A0) and h.non_resident:
+            d = []
+            for dr in h.vcn.drs:
+                if dr.offset is None:
+                    d.append(bytes(dr.length * self.dv.cluster_size))
+                else:
+                    d.append(self.dv.clusters[dr.offset:dr.offset+dr.length])
+            nrdata = b''.join(d)
+        attr = h.create(self, rdata, nrdata)
+        self._decoded[i] = attr
+        return attr
 
-        self._attrs: List[MFTAttr] = []
-        headers = sorted(headers, key=lambda a: a.type_id)
-        for h in headers:
-            rdata: Optional[bytes] = None
-            if not h.non_resident:
-                of = offmap[h] + h.attr_offset
-                rdata = data[of:of+h.attr_length]
-
-            nrdata: Optional[bytes] = None
-            if h.type_id != 0x080 and h.non_resident:
-                d = []
-                for dr in h.vcn.drs:
-                    assert dr.offset
-                    d.append(dv.clusters[dr.offset:dr.offset+dr.length])
-                nrdata = b''.join(d)
-            attr = h.create(self, rdata, nrdata)
-            self._attrs.append(attr)
-
-            if h.type_id == 0x020:
-                attr = cast(AttributeList, attr)
-                inodes = set([e.file_ref.inode for e in attr.entries])
-                inodes.discard(inode)    # don't recursive into itself
-                assert mft
-                entries = list(map(lambda inode: mft.find(inode=inode), inodes))  # type: ignore
-                for e in entries:
-                    assert e
-                    self._attrs += e._attrs
+    @property
+    def headers(self) -> List[AttrHeader]:
+        """List[AttrHeader]: The attribute headers of this entry, without those of its extensions."""
+        return self._headers if self.in_use else []
+
+    @property
+    def extensions(self) -> 'List[MFTEntry]':
+        """List[MFTEntry]: The entries holding the attributes listed in $ATTRIBUTE_LIST."""
+        return self.extensions_with()
+
+    def extensions_with(self, type_id: Union[int, str, None] = None,
+                        name: Optional[str] = None) -> 'List[MFTEntry]':
+        """Returns the entries holding attributes of `type_id` and `name`, reading only those."""
+        inodes: Set[int] = set()
+        for i, h in enumerate(self._headers):
+            if h.type_id != 0x020:
+                continue
+            for ae in cast(AttributeList, self._decode(i)).entries:
+                if isinstance(type_id, str) and TYPES.get(ae.attr_type, 'Unrecognized') != type_id:
+                    continue
+                if isinstance(type_id, int) and ae.attr_type != type_id:
+                    continue
+                if name is not None and ae.name != name:
+                    continue
+                inodes.add(ae.file_ref.inode)
+        inodes.discard(self.inode)    # don't recursive into itself
+
+        r = []
+        for inode in sorted(inodes):
+            e = self._extensions.get(inode)
+            if e is None:
+                assert self.mft
+                e = self.mft.find(inode=inode)
+                assert e
+                self._extensions[inode] = e
+            r.append(e)
+        return r
 
     def attrs(self, type_id: Union[int, str, None] = None, name: Optional[str] = None) -> List[MFTAttr]:
+        """Returns the attributes of `type_id` and `name`, decoding only those.
+
+        Extension entries are read only if $ATTRIBUTE_LIST lists such an attribute
+        in them.
+        """
         assert self.in_use and 'TODO: Deleted file recovery is not implemented'
 
-        r = self._attrs
-        if isinstance(type_id, str):
-            r = [a for a in self._attrs if a.header.type_s == type_id]
-        elif isinstance(type_id, int):
-            r = [a for a in self._attrs if a.header.type_id == type_id]
-        if name is not None:
-            r = [a for a in r if a.header.name == name]
-        return list(r)
+        r = []
+        for i, h in enumerate(self._headers):
+            if isinstance(type_id, str) and h.type_s != type_id:
+                continue
+            if isinstance(type_id, int) and h.type_id != type_id:
+                continue
+            if name is not None and h.name != name:
+                continue
+            r.append(self._decode(i))
+        for e in self.extensions_with(type_id, name):
+            r += e.attrs(type_id=type_id, name=name)
+        return r
 
     def attr(self, *args, **kwargs) -> Optional[MFTAttr]:
         attrs = self.attrs(*args, **kwargs)
@@ -111,7 +162,7 @@ class MFTEntry(object):
 
     def tabulate(self):
         return [['inode', self.inode],
-                ['Signature', '{}({})'.format(self.sig.decode(), self.sig.hex())],
+                ['Signature', '{}({})'.format(bytes(self.sig).decode(), self.sig.hex())],
                 ['Offset to Fixup', self.offset_fixup],
                 ['Entry Count in Fixup Array', self.fixup_entry_count],
                 ['$LogFile Sequence Number', self.lsn],
@@ -123,9 +174,10 @@ class MFTEntry(object):
                 ['Allocated Size of MFT Entry', self.alloc_size],
                 ['Base Record', self.base_ref.inode],
                 ['Next Attribute ID', self.next_attr_id],
-                ['#attributes', len(self._attrs)], ]
+                ['#attributes', len(self.attrs())], ]
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate())
 
     def __repr__(self):
@@ -0,0 +1,192 @@
+"""A columnar view of the MFT, parsed with NumPy.
+
+This module requires NumPy, and is only imported by `MFT.table`.
+"""
+from . import parallel
+from .fixup import apply_fixups
+
+import numpy as np
+
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+if TYPE_CHECKING:
+    from .mft import MFT
+    from .file import File
+
+
+# 100ns intervals between 1601-01-01 and 1970-01-01
+EPOCH_DIFFERENCE = 116444736000000000
+
+DTYPE = np.dtype([
+    ('inode', np.uint64),
+    ('valid', np.bool_),            # "FILE" signature and a matching update sequence
+    ('flags', np.uint16),
+    ('seq', np.uint16),
+    ('link_count', np.uint16),
+    ('base', np.uint64),            # inode of the base entry, 0 for base entries
+    ('ctime', np.uint64),           # $STANDARD_INFORMATION times, as FILETIME
+    ('atime', np.uint64),
+    ('mtime', np.uint64),
+    ('rtime', np.uint64),
+    ('parent', np.uint64),          # of the primary $FILE_NAME
+    ('name_offset', np.uint16),     # in the entry, 0 without a $FILE_NAME
+    ('name_length', np.uint8),      # in characters
+    ('namespace', np.uint8),
+    ('size', np.uint64),            # of the unnamed $DATA
+    ('allocated_size', np.uint64),
+])
+
+MAX_ATTRIBUTES = 64
+
+
+def _uint(buf: np.ndarray, rows: np.ndarray, cols: np.ndarray, size: int) -> np.ndarray:
+    r = np.zeros(len(rows), dtype=np.uint64)
+    for i in range(size):
+        r |= buf[rows, cols + i].astype(np.uint64) << np.uint64(8 * i)
+    return r
+
+
+def _parse(buf: np.ndarray, first: int, torn: Sequence[int] = ()) -> np.ndarray:
+    """Parse `n` entries of `record_size` bytes in a `(n, record_size)` array.
+
+    The rows in `torn`, whose fixups could not be applied, are left invalid.
+    """
+    n, rs = buf.shape
+    t = np.zeros(n, dtype=DTYPE)
+    rows = np.arange(n)
+    zeros = np.zeros(n, dtype=np.int64)
+
+    t['inode'] = np.arange(first, first + n, dtype=np.uint64)
+    t['valid'] = (buf[:, :4] == np.frombuffer(b'FILE', dtype=np.uint8)).all(axis=1)
+    t['valid'][list(torn)] = False
+    t['seq'] = _uint(buf, rows, zeros + 16, 2)
+    t['link_count'] = _uint(buf, rows, zeros + 18, 2)
+    t['flags'] = _uint(buf, rows, zeros + 22, 2)
+    t['base'] = _uint(buf, rows, zeros + 32, 6)
+
+    offset = _uint(buf, rows, zeros + 20, 2).astype(np.int64)
+    active = t['valid'].copy()
+    name_rank = np.zeros(n, dtype=np.uint8)
+    has_data = np.zeros(n, dtype=np.bool_)
+
+    # Walk the attributes of all entries at once, one attribute per step.
+    for _ in range(MAX_ATTRIBUTES):
+        active &= offset + 24 <= rs
+        if not active.any():
+            break
+        r = rows[active]
+        o = offset[active]
+
+        type_id = _uint(buf, r, o, 4)
+        size = _uint(buf, r, o + 4, 4).astype(np.int64)
+        ok = (type_id != 0xFFFFFFFF) & (size >= 24) & (o + size <= rs)
+        active[r[~ok]] = False
+        r, o, type_id, size = r[ok], o[ok], type_id[ok], size[ok]
+        offset[r] += size
+
+        non_resident = buf[r, o + 8] != 0
+        content = o + _uint(buf, r, o + 20, 2).astype(np.int64)
+
+        m = (type_id == 0x10) & ~non_resident & (content + 32 <= o + size)
+        for i, column in enumerate(['ctime', 'atime', 'mtime', 'rtime']):
+            t[column][r[m]] = _uint(buf, r[m], content[m] + 8 * i, 8)
+
+        m = (type_id == 0x30) & ~non_resident & (content + 66 <= o + size)
+        m[m] = content[m] + 66 + 2 * buf[r[m], content[m] + 64].astype(np.int64) <= o[m] + size[m]
+        fr, fc = r[m], content[m]
+        namespace = buf[fr, fc + 65]
+        # Like `File.name`: Win32 names first, then DOS, then any.
+        rank = np.where(namespace & 1 != 0, 3, np.where(namespace == 2, 2, 1)).astype(np.uint8)
+        better = rank > name_rank[fr]
+        fr, fc, rank, namespace = fr[better], fc[better], rank[better], namespace[better]
+        name_rank[fr] = rank
+        t['parent'][fr] = _uint(buf, fr, fc, 6)
+        t['name_length'][fr] = buf[fr, fc + 64]
+        t['namespace'][fr] = namespace
+        t['name_offset'][fr] = fc + 66
+
+        unnamed = buf[r, o + 9] == 0
+        m = (type_id == 0x80) & unnamed & ~has_data[r]
+        nr = m & non_resident & (size >= 0x40)
+        nr[nr] = _uint(buf, r[nr], o[nr] + 0x10, 8) == 0  # starting VCN
+        has_data[r[nr]] = True
+        t['allocated_size'][r[nr]] = _uint(buf, r[nr], o[nr] + 0x28, 8)
+        t['size'][r[nr]] = _uint(buf, r[nr], o[nr] + 0x30, 8)
+        res = m & ~non_resident
+        has_data[r[res]] = True
+        t['size'][r[res]] = _uint(buf, r[res], o[res] + 0x10, 4)
+        t['allocated_size'][r[res]] = t['size'][r[res]]
+
+    return t
+
+
+def _parse_entries(mft: 'MFT', first: int, count: int) -> np.ndarray:
+    rs = mft.record_size
+    data = bytearray().join(mft.read(count=count * rs, skip=first * rs))
+    torn = apply_fixups(data, rs)
+    n = len(data) // rs
+    buf = np.frombuffer(data, dtype=np.uint8, count=n * rs).reshape(n, rs)
+    return _parse(buf, first, torn)
+
+
+class MFTTable(object):
+    """
+    All MFT entries of a filesystem as a NumPy structured array, see `DTYPE`.
+
+    Only the fields of an entry itself are parsed; attributes moved to extension
+    entries by an $ATTRIBUTE_LIST are not merged into the base entry. Times are kept
+    as FILETIME, see `datetime64`.
+
+    Examples
+    --------
+    In-use files larger than 1 GiB modified in the last week.
+
+    >>> t = fs.mft.table()
+    >>> a = t.array
+    >>> week_ago = np.datetime64('now') - np.timedelta64(7, 'D')
+    >>> m = (a['flags'] == 1) & (a['size'] > 1 << 30) & (t.datetime64('mtime') > week_ago)
+    >>> list(t.files(m))
+    """
+
+    def __init__(self, mft: 'MFT', array: np.ndarray):
+        self.mft = mft
+        self.array = array
+
+    @staticmethod
+    def build(mft: 'MFT', chunk_size: int = 4 << 20, workers: int = 0) -> 'MFTTable':
+        """Parse all MFT entries, reading `chunk_size` bytes of $MFT at a time.
+
+        With more than 1 `workers`, chunks are parsed in as many processes.
+        """
+        chunks = parallel.map_entries(mft, _parse_entries, workers,
+                                      chunk_entries=chunk_size // mft.record_size)
+        array = np.concatenate(chunks) if chunks else np.zeros(0, dtype=DTYPE)
+        return MFTTable(mft, array)
+
+    def datetime64(self, column: str) -> np.ndarray:
+        """Returns a time column as `numpy.datetime64` in microseconds."""
+        ft = self.array[column].astype(np.int64)
+        return ((ft - EPOCH_DIFFERENCE) // 10).astype('datetime64[us]')
+
+    def name(self, i: int) -> str:
+        """Returns the primary file name of row `i`, reading its entry."""
+        row = self.array[i]
+        begin = int(row['name_offset'])
+        if not begin:
+            return ''
+        data = self.mft.record(int(row['inode']))
+        return bytes(data[begin:begin+2*int(row['name_length'])]).decode('utf-16')
+
+    def files(self, mask: np.ndarray) -> 'Iterable[File]':
+        """Yields the files of the rows selected by `mask`."""
+        for inode in self.array['inode'][mask]:
+            yield self.mft.fs.find(inode=int(inode))
+
+    def __len__(self):
+        return len(self.array)
+
+    def __str__(self):
+        return '<MFTTable {} entries>'.format(len(self))
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,146 @@
+from .mft_entry import MFTEntry
+from .mft_attr import FileName
+from . import parallel
+
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, cast, TYPE_CHECKING
+import fnmatch
+import re
+
+if TYPE_CHECKING:
+    from .mft import MFT
+
+
+class Name(NamedTuple):
+    name: str
+    inode: int
+    parent: int
+    namespace: int
+
+
+def _names(mft: 'MFT', first: int, count: int) -> List[Name]:
+    names = []
+    for inode in range(first, first + count):
+        e = MFTEntry(mft.record(inode), mft.fs, inode, mft)
+        if not e.in_use or e.base_ref.inode != 0:
+            # Attributes of extension entries are indexed with their base entry.
+            continue
+        for a in e.attrs(type_id='$FILE_NAME'):
+            fn = cast(FileName, a)
+            names.append(Name(fn.filename, inode, fn.parent.inode, fn.namespace))
+    return names
+
+
+class NameIndex(object):
+    """
+    An index of all names in $FILE_NAME attributes, built with one pass over the MFT.
+
+    Every name of a file is indexed, i.e. its Win32, DOS and POSIX names and the
+    names of its hard links. Lookups are case-insensitive unless `case_sensitive`
+    is set, as on NTFS itself.
+    """
+
+    def __init__(self):
+        self._names: Dict[str, List[Name]] = {}
+        self._keys: Optional[List[str]] = None
+        self.parents: Dict[int, Set[int]] = {}
+        self.names_of: Dict[int, List[Name]] = {}
+        self.children: Dict[int, List[Name]] = {}
+
+    @staticmethod
+    def key(name: str) -> str:
+        return name.upper()
+
+    @staticmethod
+    def build(mft: 'MFT', workers: int = 0,
+              chunk_entries: int = parallel.DEFAULT_CHUNK_ENTRIES) -> 'NameIndex':
+        """Index the names of all MFT entries in use, in `workers` processes if more than 1.
+
+        Each process parses `chunk_entries` entries at a time.
+        """
+        index = NameIndex()
+        for names in parallel.map_entries(mft, _names, workers, chunk_entries):
+            for n in names:
+                index.add(n)
+        return index
+
+    def add(self, name: Name):
+        self._names.setdefault(NameIndex.key(name.name), []).append(name)
+        self.parents.setdefault(name.inode, set()).add(name.parent)
+        self.names_of.setdefault(name.inode, []).append(name)
+        self.children.setdefault(name.parent, []).append(name)
+        self._keys = None
+
+    @property
+    def keys(self) -> List[str]:
+        """List[str]: The indexed names in upper case, sorted."""
+        if self._keys is None:
+            self._keys = sorted(self._names)
+        return self._keys
+
+    def __iter__(self) -> Iterator[Name]:
+        return (n for names in self._names.values() for n in names)
+
+    def __len__(self):
+        return sum(len(names) for names in self._names.values())
+
+    def find(self, name: str, case_sensitive: bool = False) -> List[Name]:
+        """Returns the entries of `name`."""
+        names = self._names.get(NameIndex.key(name), [])
+        if case_sensitive:
+            names = [n for n in names if n.name == name]
+        return list(names)
+
+    def startswith(self, prefix: str, case_sensitive: bool = False) -> List[Name]:
+        """Returns the entries of the names starting with `prefix`."""
+        key = NameIndex.key(prefix)
+        keys = self.keys
+        r: List[Name] = []
+        for i in range(bisect_left(keys, key), len(keys)):
+            if not keys[i].startswith(key):
+                break
+            r += self._names[keys[i]]
+        if case_sensitive:
+            r = [n for n in r if n.name.startswith(prefix)]
+        return r
+
+    def search(self, regex: str, case_sensitive: bool = False) -> List[Name]:
+        """Returns the entries of the names containing a match of `regex`."""
+        reobj = re.compile(regex, 0 if case_sensitive else re.IGNORECASE)
+        return [n for n in self if reobj.search(n.name)]
+
+    def glob(self, pattern: str, case_sensitive: bool = False) -> List[Name]:
+        """Returns the entries of the names matching the shell-style `pattern`."""
+        reobj = re.compile(fnmatch.translate(pattern), 0 if case_sensitive else re.IGNORECASE)
+        literal = re.match(r'[^*?\[]*', pattern).group(0)  # type: ignore
+        candidates = self.startswith(literal) if literal else self
+        return [n for n in candidates if reobj.match(n.name)]
+
+    def display_name(self, inode: int) -> str:
+        """The name of `inode` as `File.name`, i.e. its first Win32 name, else its DOS name."""
+        names = self.names_of.get(inode, [])
+        n = next((n for n in names if (n.namespace & 1) != 0), None) or \
+            next((n for n in names if n.namespace == 2), None)
+        if n:
+            return n.name
+        return names[0].name if names else ''
+
+    def is_under(self, inode: int, ancestor: int) -> bool:
+        """Whether any path of `inode` goes through the directory `ancestor`."""
+        seen: Set[int] = set()
+        todo = [inode]
+        while todo:
+            i = todo.pop()
+            for p in self.parents.get(i, ()):
+                if p == ancestor:
+                    return True
+                if p not in seen:
+                    seen.add(p)
+                    todo.append(p)
+        return False
+
+    def __str__(self):
+        return '<NameIndex {} names>'.format(len(self))
+
+    def __repr__(self):
+        return self.__str__()
@@ -1,17 +1,37 @@
 from .mft import MFT
 from .boot_sector import BootSector
 from .file import File
+from .fixup import apply_fixups
+from . import collation
 
 from ..entity import Entity
 from ..data_units import DataUnits
 from ..disk_view import DiskView
+from ..disk import Buffer
+from ..object_cache import ObjectCache
 
-from typing import Optional, Iterable
+from typing import Dict, Optional, Iterable, List
+import hashlib
+import struct
 
 
 class NTFS(object):
+    """
+    An NTFS filesystem.
+
+    Parsed MFT entries are cached in `mft.entries`, up to `ENTRY_CACHE_SIZE` of
+    them, and `File` objects in `file_cache`, up to `FILE_CACHE_SIZE`. A file
+    found twice is the same object as long as either cache, or any caller, keeps
+    it alive. Both limits can be changed through the `capacity` of the caches.
+    """
+
+    ENTRY_CACHE_SIZE = MFT.DEFAULT_ENTRY_CACHE_SIZE
+    FILE_CACHE_SIZE = 4096
+    METADATA_FILES = 16     # $MFT to the reserved entries before the first file
+
     def __init__(self, dv: DiskView, sector0: bytes, parent):
         # Entity.__init__(self)
+        self.parent = parent
         self.boot_sector = BootSector(sector0)
         bs = self.boot_sector
         self.dv = DiskView(dv.disk, dv.begin, dv.size,
@@ -24,13 +44,19 @@ class NTFS(object):
 
         self.clusters = self.dv.clusters
 
-        i = self.boot_sector.mft_cluster_number
-        n = self.boot_sector.cluster_per_file_record_segment
-        self.mft = MFT(self, self.clusters[i:i+n])
+        offset = self.boot_sector.mft_cluster_number * self.cluster_size
+        data = bytearray(self.read(size=self.boot_sector.file_record_size, offset=offset))
+        apply_fixups(data, len(data))
+        self.mft = MFT(self, bytes(data), entry_cache_size=NTFS.ENTRY_CACHE_SIZE)
+        self.file_cache = ObjectCache(NTFS.FILE_CACHE_SIZE)
 
-        e = self.mft.find(inode=5)
-        assert e
-        self.root = File(e, self)
+        self._upcase: Optional[Dict[int, int]] = None
+        self._upcase_loaded = False
+        self._volume_key: Optional[str] = None
+
+        root = self.find(inode=5)
+        assert root
+        self.root = root
 
     @property
     def files(self) -> Iterable[File]:
@@ -39,16 +65,97 @@ class NTFS(object):
             if f and f.is_allocated:
                 yield f
 
-    def get_file(self, offset: int)-> Optional[File]:
-        cluster = offset / self.cluster_size
-        for f in self.files:
-            if f.contains(cluster=cluster):
-                return f
+    @property
+    def image(self):
+        """DiskImage: The image holding the filesystem, None if unknown."""
+        e = self.parent
+        while e is not None:
+            if getattr(e, 'image', None) is not None:
+                return e.image
+            e = e.parent
         return None
 
-    def find(self, inode: Optional[int] = None, name: Optional[str] = None) -> Optional[File]:
-        e = self.mft.find(inode=inode, name=name)
-        return File(e, self) if e else None
+    @property
+    def upcase(self) -> Optional[Dict[int, int]]:
+        """Dict[int, int]: The code units changed by $UpCase, None if it is unreadable."""
+        if not self._upcase_loaded:
+            f = self.find(inode=10)
+            self._upcase = collation.upcase_table(f.data) if f else None
+            self._upcase_loaded = True
+        return self._upcase
+
+    def open(self, path: str) -> Optional[File]:
+        """Returns the file at `path`, None if there is none.
+
+        Path components are separated by "/" or "\\" and looked up with
+        `File.child`, so only the index records on the path are read. Use
+        `File.open` to read the file.
+
+        Examples
+        --------
+        >>> fs.open('/Windows/System32/config/SYSTEM').open().read(4)
+        b'regf'
+        """
+        f: Optional[File] = self.root
+        for name in path.replace('\\', '/').split('/'):
+            if f is None:
+                break
+            if name in ('', '.'):
+                continue
+            if name == '..':
+                f = f.parent or f
+            else:
+                f = f.child(name)
+        return f
+
+    @property
+    def metadata(self):
+        """MetadataStore: The store of the indexes of the image, None if disabled."""
+        image = self.image
+        return image.metadata if image is not None else None
+
+    @property
+    def volume_key(self) -> str:
+        """str: Identifies the volume by the identity of its image, its location,
+        serial number and boot sector, and the MFT entries of its metadata files.
+
+        The image identity includes the modification time of the image files, so
+        the key changes whenever the image is written to, e.g. when files of the
+        volume are added or renamed. It is computed on first use.
+        """
+        if self._volume_key is None:
+            image = self.image
+            h = hashlib.sha1(repr(image.identity if image is not None else None).encode())
+            h.update(struct.pack('<QQQ', self.dv.begin, self.dv.size,
+                                 self.boot_sector.volume_serial_number))
+            h.update(self.boot_sector.raw)
+            for inode in range(min(NTFS.METADATA_FILES, self.mft.entry_total)):
+                h.update(self.mft.record(inode))
+            self._volume_key = h.hexdigest()
+        return self._volume_key
+
+    def get_file(self, offset: int)-> Optional[File]:
+        """Returns the file whose data holds the byte at `offset`, using `mft.cluster_index`."""
+        return self.get_files([offset])[0]
+
+    def get_files(self, offsets: Iterable[int]) -> List[Optional[File]]:
+        """Returns the file whose data holds the byte at each of `offsets`."""
+        index = self.mft.cluster_index
+        r: List[Optional[File]] = []
+        for allocations in index.lookup(o // self.cluster_size for o in offsets):
+            inodes = [a.inode for a in allocations if a.type_id == 0x80 and a.name == '']
+            r.append(self.find(inode=min(inodes)) if inodes else None)
+        return r
+
+    def find(self, inode: Optional[int] = None, name: Optional[str] = None,
+             case_sensitive: bool = True) -> Optional[File]:
+        e = self.mft.find(inode=inode, name=name, case_sensitive=case_sensitive)
+        if not e:
+            return None
+        f = self.file_cache.get(e.inode)
+        if f is None:
+            f = self.file_cache.put(e.inode, File(e, self))
+        return f
 
     @property
     def sector_size(self):
@@ -58,5 +165,5 @@ class NTFS(object):
     def cluster_size(self):
         return self.boot_sector.cluster_size
 
-    def read(self, size: int, offset: int) -> bytes:
+    def read(self, size: int, offset: int) -> Buffer:
         return self.dv.read(offset=offset, size=size)
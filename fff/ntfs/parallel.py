@@ -0,0 +1,79 @@
+"""Parse ranges of MFT entries in worker processes.
+
+Each worker opens the disk image itself, from `DiskImage.options`, so no file
+handle or parsed object crosses a process boundary; only the compact results of
+each range are sent back.
+"""
+from typing import Any, Callable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .mft import MFT
+
+
+DEFAULT_CHUNK_ENTRIES = 16384
+
+# The MFT of the filesystem opened by a worker process.
+_mft: Optional['MFT'] = None
+
+
+def _open(options: dict, begin: int, size: int):
+    global _mft
+    from .. import DiskImage
+    from ..disk_view import DiskView
+    from .ntfs import NTFS
+
+    image = DiskImage(**options)
+    dv = DiskView(image._disk, begin, size)
+    _mft = NTFS(dv, bytes(dv.read(512, offset=0)), None).mft
+
+
+def _run(func: Callable[['MFT', int, int], Any], first: int, count: int) -> Any:
+    assert _mft is not None
+    return func(_mft, first, count)
+
+
+def ranges(total: int, chunk_entries: int) -> List[Tuple[int, int]]:
+    """Split `total` entries into `(first, count)` ranges of `chunk_entries`."""
+    chunk_entries = max(1, chunk_entries)
+    return [(first, min(chunk_entries, total - first))
+            for first in range(0, total, chunk_entries)]
+
+
+def map_entries(mft: 'MFT', func: Callable[['MFT', int, int], Any], workers: int = 0,
+                chunk_entries: int = DEFAULT_CHUNK_ENTRIES) -> List[Any]:
+    """
+    Call `func(mft, first, count)` on consecutive ranges of all MFT entries.
+
+    Parameters
+    ----------
+    mft : MFT
+        The MFT to parse.
+    func : Callable
+        A module level function, so it can be sent to the workers.
+    workers : int
+        The number of worker processes. With 1 or less, or when the filesystem
+        was not opened through a `DiskImage`, the ranges are parsed in this process.
+        So are they when the image is not `DiskImage.reopenable`, e.g. a compressed
+        image whose index is only kept in memory, which each worker would
+        otherwise decompress whole to rebuild it.
+    chunk_entries : int
+        The number of entries in a range.
+
+    Returns
+    -------
+    List
+        The results of `func`, in the order of the ranges whichever worker
+        finishes first.
+    """
+    todo = ranges(mft.entry_total, chunk_entries)
+    image = mft.fs.image
+    if workers <= 1 or image is None or not image.reopenable or len(todo) <= 1:
+        return [func(mft, first, count) for first, count in todo]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    dv = mft.fs.dv
+    with ProcessPoolExecutor(min(workers, len(todo)), initializer=_open,
+                             initargs=(image.options, dv.begin, dv.size)) as pool:
+        futures = [pool.submit(_run, func, first, count) for first, count in todo]
+        return [f.result() for f in futures]
@@ -1,7 +1,12 @@
-from typing import Optional, List, Tuple, cast
+from array import array
+from bisect import bisect_right
+from typing import Optional, List, NamedTuple, Tuple, Iterable, Iterator, cast
+from itertools import accumulate, chain, repeat
 
 
 class DataRun(object):
+    __slots__ = ['length', 'offset']
+
     def __init__(self, length: int, offset: Optional[int]):
         self.length = length
         self.offset = offset
@@ -13,27 +18,86 @@ class DataRun(object):
         return '(offset: {}, length: {})'.format(self.offset, self.length)
 
 
+class Extent(NamedTuple):
+    """Consecutive virtual clusters stored in consecutive logical clusters."""
+    vcn: int
+    lcn: Optional[int]  # None for sparse clusters
+    length: int
+
+
 class VCN(object):
+    """
+    The mapping of virtual cluster numbers of an attribute to logical cluster numbers.
+
+    Sparse clusters map to `None`. Only the data runs are kept, with the first VCN
+    of each run in `starts`, so memory is proportional to the number of runs and a
+    lookup is a binary search. Indexing by an int returns a logical cluster
+    number, slicing returns the `Extent`s of the clusters in the slice.
+    """
+
+    __slots__ = ['drs', 'count', 'starts']
+
     def __init__(self, data: Optional[bytes] = None, offset: int = 0):
         self.drs: List[DataRun]
-        self.clusters: List[int]
         if data is None:
             self.drs = []
-            self.count = 0
-            self.clusters = []
         else:
             _, self.drs = parse_data_runs(data, offset)
-            self.count = sum([dr.length for dr in self.drs])
-            self.clusters = list([c for dr in self.drs for c in self._expand(dr)])
+        self.starts = array('q', accumulate((dr.length for dr in self.drs[:-1]), initial=0)
+                            if self.drs else [])
+        self.count = self.starts[-1] + self.drs[-1].length if self.drs else 0
+
+    def _run(self, index: int) -> int:
+        return bisect_right(self.starts, index) - 1
+
+    @property
+    def clusters(self) -> List[Optional[int]]:
+        return list(self)
 
-    def _expand(self, dr: DataRun):
+    def _expand(self, dr: DataRun) -> Iterable[Optional[int]]:
         if dr.offset is None:
-            return [None] * dr.length
+            return repeat(None, dr.length)
         else:
-            return list(range(dr.offset, dr.offset + dr.length))
+            return range(dr.offset, dr.offset + dr.length)
+
+    def __iter__(self) -> Iterator[Optional[int]]:
+        return chain.from_iterable(self._expand(dr) for dr in self.drs)
+
+    def __len__(self):
+        return self.count
+
+    def extents(self, start: int = 0, stop: Optional[int] = None) -> List[Extent]:
+        """Returns the extents of VCNs `start` to `stop`, clipped to the attribute."""
+        stop = self.count if stop is None else min(stop, self.count)
+        r: List[Extent] = []
+        if start >= stop:
+            return r
+        for i in range(self._run(start), len(self.drs)):
+            begin = self.starts[i]
+            if begin >= stop:
+                break
+            dr = self.drs[i]
+            first = max(start, begin)
+            last = min(stop, begin + dr.length)
+            lcn = None if dr.offset is None else dr.offset + first - begin
+            r.append(Extent(first, lcn, last - first))
+        return r
 
     def __getitem__(self, index_or_slice):
-        return self.clusters[index_or_slice]
+        if isinstance(index_or_slice, slice):
+            start, stop, step = index_or_slice.indices(self.count)
+            if step != 1:
+                raise ValueError('VCN slices must be contiguous')
+            return self.extents(start, stop)
+
+        index = index_or_slice
+        if index < 0:
+            index += self.count
+        if index < 0 or index >= self.count:
+            raise IndexError('VCN {} out of range'.format(index_or_slice))
+        i = self._run(index)
+        dr = self.drs[i]
+        return None if dr.offset is None else dr.offset + index - self.starts[i]
 
     def __repr__(self):
         return self.__str__()
@@ -0,0 +1,93 @@
+from .block_cache import CacheStats
+
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+import threading
+import weakref
+
+
+class ObjectCache(object):
+    """
+    A size-bounded LRU cache of parsed objects, which is also an identity map.
+
+    The `capacity` most recently used objects are kept alive by the cache. Evicted
+    objects are still found as long as they are referenced elsewhere, so a key
+    never maps to two live objects at the same time.
+
+    Parameters
+    ----------
+    capacity : int
+        The maximum number of objects kept alive by the cache.
+    """
+
+    def __init__(self, capacity: int):
+        assert capacity >= 0
+
+        self._capacity = capacity
+        self.stats = CacheStats()
+
+        self._recent: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._live: 'weakref.WeakValueDictionary[Hashable, Any]' = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @capacity.setter
+    def capacity(self, capacity: int):
+        assert capacity >= 0
+        with self._lock:
+            self._capacity = capacity
+            self._trim()
+
+    def _trim(self):
+        while len(self._recent) > self._capacity:
+            self._recent.popitem(last=False)
+            self.stats.evictions += 1
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            value = self._recent.get(key)
+            if value is None:
+                value = self._live.get(key)
+            if value is None:
+                self.stats.misses += 1
+                return None
+            self.stats.hits += 1
+            self._recent[key] = value
+            self._recent.move_to_end(key)
+            self._trim()
+            return value
+
+    def put(self, key: Hashable, value: Any) -> Any:
+        """Add `value` unless an object of `key` is alive, and return the live one."""
+        with self._lock:
+            live = self._live.get(key)
+            if live is not None:
+                value = live
+            else:
+                self._live[key] = value
+            self._recent[key] = value
+            self._recent.move_to_end(key)
+            self._trim()
+            return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._recent or key in self._live
+
+    def __len__(self):
+        return len(self._live)
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._live = weakref.WeakValueDictionary()
+
+    def __str__(self):
+        return '<ObjectCache {}/{} objects, {} hits, {} misses>'.format(
+            len(self._recent), self._capacity, self.stats.hits, self.stats.misses)
+
+    def __repr__(self):
+        return self.__str__()
@@ -3,8 +3,6 @@ from .data_units import DataUnits
 from . import filesystem
 from .disk_view import DiskView
 
-from tabulate import tabulate
-
 import struct
 from functools import reduce
 import operator
@@ -72,6 +70,7 @@ class Partition(Entity):
         self.size = sector_count * self.sector_size
 
         self.ebr: Optional[Entity] = None
+        self._filesystem = None
 
         self.dv = DiskView(parent.dv.disk, self.first_sector*self.sector_size,
                            self.size, sector_size=self.sector_size)
@@ -96,6 +95,7 @@ class Partition(Entity):
                                 hex(self.partition_type))
 
     def hexdump(self):
+        from hexdump import hexdump as hd
         return hd(self.data)
 
     def get_file(self, offset: int):
@@ -105,7 +105,10 @@ class Partition(Entity):
 
     @property
     def filesystem(self):
-        return filesystem.get_filesystem(self.dv, self)
+        # Parsed once, so the caches and indexes of the filesystem are kept.
+        if self._filesystem is None:
+            self._filesystem = filesystem.get_filesystem(self.dv, self)
+        return self._filesystem
 
     def read(self, offset, size):
         return self.dv.read(size, offset=offset)
@@ -128,6 +131,7 @@ class Partition(Entity):
 
     def __str__(self):
         rows = reduce(operator.add, [e.tabulate() for e in self.entities])
+        from tabulate import tabulate
         return tabulate(rows,
                         headers=['#', 'Slot', 'Start', 'End', 'Length',
                                  'Description', 'CHS', ])
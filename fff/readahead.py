@@ -0,0 +1,122 @@
+from .disk import Disk, Buffer
+
+from typing import List, Optional
+import threading
+
+
+class Stream(object):
+    """A sequential access pattern, with the data fetched ahead of it."""
+
+    def __init__(self, offset: int, window: int):
+        self.next = offset
+        self.window = window
+        self.buffer: Buffer = b''
+        self.buffer_offset = offset
+
+    @property
+    def buffer_end(self) -> int:
+        return self.buffer_offset + len(self.buffer)
+
+    def covers(self, size: int, offset: int) -> bool:
+        return self.buffer_offset <= offset and offset + size <= self.buffer_end
+
+    def __repr__(self):
+        return '<Stream next: {} window: {}>'.format(self.next, self.window)
+
+
+class Readahead(Disk):
+    """
+    Adaptive readahead in front of another disk.
+
+    A read starting where a previous read ended is considered sequential. The first
+    sequential read of a stream fetches `min_window` bytes ahead, and each time the
+    prefetched data is used up the window doubles, up to `max_window`. Random reads
+    are passed through unchanged, so random workloads pay nothing. Up to `max_streams`
+    streams, e.g. several files copied at once, are tracked independently.
+
+    Parameters
+    ----------
+    disk : Disk
+        The underlying disk.
+    max_window : int
+        The maximum number of bytes fetched ahead of a stream.
+    min_window : int
+        The initial readahead window of a stream.
+    max_streams : int
+        The number of sequential streams tracked at the same time.
+    """
+
+    DEFAULT_MAX_WINDOW = 2 << 20
+    DEFAULT_MIN_WINDOW = 128 << 10
+    DEFAULT_MAX_STREAMS = 8
+
+    def __init__(self, disk: Disk, max_window: int = DEFAULT_MAX_WINDOW,
+                 min_window: int = DEFAULT_MIN_WINDOW, max_streams: int = DEFAULT_MAX_STREAMS):
+        assert 0 < min_window <= max_window
+
+        self.disk = disk
+        self.max_window = max_window
+        self.min_window = min_window
+        self.max_streams = max_streams
+        self.enabled = True
+
+        # Most recently used streams last
+        self._streams: List[Stream] = []
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self.disk.size
+
+    def _find(self, size: int, offset: int) -> Optional[Stream]:
+        for s in reversed(self._streams):
+            if s.covers(size, offset) or s.next == offset:
+                return s
+        return None
+
+    def _touch(self, stream: Stream):
+        if stream in self._streams:
+            self._streams.remove(stream)
+        self._streams.append(stream)
+        del self._streams[:-self.max_streams]
+
+    def read(self, size: int, offset: int) -> Buffer:
+        if not self.enabled or size <= 0:
+            return self.disk.read(size, offset)
+
+        with self._lock:
+            stream = self._find(size, offset)
+            if stream is None:
+                # Not (yet) sequential
+                self._touch(Stream(offset + size, self.min_window))
+            elif stream.covers(size, offset):
+                begin = offset - stream.buffer_offset
+                stream.next = offset + size
+                self._touch(stream)
+                return memoryview(stream.buffer)[begin:begin+size]
+            else:
+                window = stream.window
+                stream.window = min(stream.window * 2, self.max_window)
+                stream.next = offset + size
+                self._touch(stream)
+
+        if stream is None:
+            return self.disk.read(size, offset)
+
+        data = self.disk.read(max(size, window), offset)
+        with self._lock:
+            stream.buffer = data
+            stream.buffer_offset = offset
+        return memoryview(data)[:size]
+
+    def close(self):
+        with self._lock:
+            self._streams = []
+        self.disk.close()
+
+    def __str__(self):
+        return '<Readahead {} streams, max window: {}>'.format(len(self._streams),
+                                                               self.max_window)
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,81 @@
+from fff.block_cache import BlockCache
+
+from unittest import TestCase
+import random
+
+from .disk_fakes import MemoryDisk
+from .disk_tests import read_concurrently
+
+
+class BlockCacheTests(TestCase):
+
+    DATA = bytes(random.getrandbits(8) for _ in range(64 * 1024 + 100))
+
+    def setUp(self):
+        self.disk = MemoryDisk(BlockCacheTests.DATA)
+
+    def test_reads_across_blocks(self):
+        sut = BlockCache(self.disk, capacity=1 << 20, block_size=4096)
+        data = BlockCacheTests.DATA
+
+        for _ in range(200):
+            offset = random.randrange(len(data))
+            size = random.randrange(1, 20000)
+            self.assertEqual(data[offset:offset+size], sut.read(size, offset))
+
+    def test_repeated_read_hits(self):
+        sut = BlockCache(self.disk, capacity=1 << 20, block_size=4096)
+
+        sut.read(100, 5000)
+        sut.read(100, 5000)
+        sut.read(10, 4100)
+
+        self.assertEqual(1, len(self.disk.reads))
+        self.assertEqual(1, sut.stats.misses)
+        self.assertEqual(2, sut.stats.hits)
+
+    def test_consecutive_misses_are_one_read(self):
+        sut = BlockCache(self.disk, capacity=1 << 20, block_size=4096)
+
+        sut.read(4096 * 3, 100)
+
+        self.assertEqual(1, len(self.disk.reads))
+        self.assertEqual(4, sut.stats.misses)
+
+    def test_lru_eviction_within_budget(self):
+        sut = BlockCache(self.disk, capacity=4 * 4096, block_size=1024 * 4)
+
+        for i in range(6):
+            sut.read(1, i * 4096)
+        sut.read(1, 5 * 4096)
+
+        self.assertEqual(4 * 4096, sut.cached_bytes)
+        self.assertEqual(2, sut.stats.evictions)
+        self.assertEqual(1, sut.stats.hits)
+
+        sut.read(1, 0)
+        self.assertEqual(7, len(self.disk.reads))
+
+    def test_block_size_is_clamped_to_the_capacity(self):
+        sut = BlockCache(self.disk, capacity=8 * 1024, block_size=64 * 1024)
+
+        actual = sut.read(100, 1000)
+
+        self.assertEqual(2048, sut.block_size)
+        self.assertEqual(BlockCacheTests.DATA[1000:1100], actual)
+        self.assertEqual(0, sut.stats.bypasses)
+        self.assertEqual(2048, sut.cached_bytes)
+
+    def test_large_reads_bypass_cache(self):
+        sut = BlockCache(self.disk, capacity=16 * 1024, block_size=1024)
+
+        actual = sut.read(8192, 0)
+
+        self.assertEqual(BlockCacheTests.DATA[:8192], actual)
+        self.assertEqual(1, sut.stats.bypasses)
+        self.assertEqual(0, sut.cached_bytes)
+
+    def test_concurrent_reads(self):
+        sut = BlockCache(self.disk, capacity=16 * 1024, block_size=1024)
+
+        read_concurrently(self, sut, BlockCacheTests.DATA)
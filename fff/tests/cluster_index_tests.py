@@ -0,0 +1,38 @@
+from fff.ntfs import Allocation, ClusterIndex
+
+from unittest import TestCase
+
+
+def allocation(lcn: int, length: int, inode: int) -> Allocation:
+    return Allocation(lcn, length, inode, 0x80, '', 0)
+
+
+class ClusterIndexTests(TestCase):
+
+    def setUp(self):
+        self.a = allocation(100, 50, 1)
+        self.b = allocation(10, 5, 2)
+        self.c = allocation(20, 100, 3)     # overlaps a
+        self.d = allocation(130, 5, 4)      # inside a and c
+        self.sut = ClusterIndex([self.a, self.b, self.c, self.d])
+
+    def test_at(self):
+        self.assertEqual([self.b], self.sut.at(10))
+        self.assertEqual([self.b], self.sut.at(14))
+        self.assertEqual([], self.sut.at(15))
+        self.assertEqual([], self.sut.at(0))
+        self.assertEqual([self.c], self.sut.at(99))
+        self.assertEqual([self.c, self.a], self.sut.at(100))
+        self.assertEqual([self.a, self.d], self.sut.at(130))
+        self.assertEqual([], self.sut.at(150))
+
+    def test_overlapping(self):
+        self.assertEqual([self.b, self.c], self.sut.overlapping(14, 7))
+        self.assertEqual([], self.sut.overlapping(15, 5))
+        self.assertEqual([self.c, self.a, self.d], self.sut.overlapping(119, 20))
+
+    def test_lookup(self):
+        self.assertEqual([[self.b], [], [self.a]], self.sut.lookup([12, 0, 145]))
+
+    def test_conflicts(self):
+        self.assertEqual([(self.c, self.a), (self.a, self.d)], self.sut.conflicts())
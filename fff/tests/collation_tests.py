@@ -0,0 +1,64 @@
+from fff.ntfs import collation
+
+from unittest import TestCase
+import struct
+
+from .ntfs_fakes import index_entries, index_entry
+
+
+def node(*names, child_vcns=None):
+    child_vcns = child_vcns or [None] * (len(names) + 1)
+    return index_entries(b''.join(index_entry(n, child_vcn=c)
+                                  for n, c in zip(names + (None,), child_vcns)))
+
+
+class CollationTests(TestCase):
+
+    def setUp(self):
+        self.nodes = {
+            0: node('a.txt', 'B.txt'),
+            1: node('d.txt', 'x'),
+            2: node('zeta', '_x'),
+        }
+        self.root = node('c.txt', 'Y', child_vcns=[0, 1, 2])
+        self.read = []
+
+    def read_node(self, vcn: int):
+        self.read.append(vcn)
+        return self.nodes[vcn]
+
+    def lookup(self, name: str):
+        e = collation.lookup(self.root, name, None, self.read_node)  # type: ignore
+        return e.filename.filename if e else None
+
+    def test_upcase_table(self):
+        data = b''.join(struct.pack('<H', c) for c in range(collation.UPCASE_ENTRIES))
+        data = data[:2*ord('a')] + b'A\x00' + data[2*ord('a')+2:]
+
+        table = collation.upcase_table(data)
+
+        self.assertEqual({ord('a'): ord('A')}, table)
+        self.assertEqual(collation.collate('A', None), collation.collate('a', table))
+        self.assertNotEqual(collation.collate('B', None), collation.collate('b', table))
+        self.assertIsNone(collation.upcase_table(data[:100]))
+
+    def test_collate_orders_by_upcased_code_units(self):
+        # "_" sorts after the letters, which are compared in upper case.
+        self.assertLess(collation.collate('zeta', None), collation.collate('_x', None))
+        # Surrogate pairs sort before the code units above them.
+        self.assertGreater(collation.collate('\uffff', None), collation.collate('\U00010000', None))
+
+    def test_lookup_in_root(self):
+        self.assertEqual('c.txt', self.lookup('C.TXT'))
+        self.assertEqual([], self.read)
+
+    def test_lookup_reads_only_the_path(self):
+        self.assertEqual('b.txt', self.lookup('b.txt').lower())
+        self.assertEqual([0], self.read)
+        self.assertEqual('x', self.lookup('X'))
+        self.assertEqual('_x', self.lookup('_X'))
+        self.assertEqual([0, 1, 2], self.read)
+
+    def test_lookup_missing(self):
+        self.assertIsNone(self.lookup('b'))
+        self.assertIsNone(self.lookup('zz'))
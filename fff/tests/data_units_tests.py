@@ -0,0 +1,41 @@
+from fff.disk_view import DiskView
+
+from unittest import TestCase
+
+from .disk_fakes import MemoryDisk
+
+
+class DataUnitsTests(TestCase):
+
+    DATA = bytes(range(256)) * 16
+
+    def setUp(self):
+        self.disk = MemoryDisk(DataUnitsTests.DATA)
+        self.sut = DiskView(self.disk, 512, 2048, sector_size=512).sectors
+
+    def unit(self, i: int) -> bytes:
+        return DataUnitsTests.DATA[512 + i*512:512 + (i+1)*512]
+
+    def test_gather_coalesces_adjacent_units(self):
+        actual = self.sut[[2, 3, 0, -1]]
+
+        self.assertEqual([self.unit(2), self.unit(3), self.unit(0), self.unit(3)],
+                         [bytes(u) for u in actual])
+        self.assertEqual([(1024, 1536), (512, 512), (512, 2048)], self.disk.reads)
+
+    def test_gather_empty(self):
+        self.assertEqual([], self.sut[[]])
+        self.assertEqual([], self.disk.reads)
+
+    def test_array(self):
+        try:
+            import numpy as np
+        except ImportError:
+            self.skipTest('numpy is not installed')
+
+        actual = self.sut.array(np.array([1, 2, 0]))
+
+        self.assertEqual((3, 512), actual.shape)
+        self.assertEqual(np.uint8, actual.dtype)
+        self.assertEqual(self.unit(1) + self.unit(2) + self.unit(0), actual.tobytes())
+        self.assertEqual(self.unit(2), self.sut[np.int64(2)])
@@ -0,0 +1,40 @@
+from fff.ntfs import DirEntry, FileRef
+from fff.ntfs.mft_attr import FileNameHeader
+
+from unittest import TestCase
+import struct
+
+from .ntfs_fakes import DIRECTORY, FakeFilesystem, file_name
+
+
+class FakeFile(object):
+    fullpath = '/Docs/readme.txt'
+
+
+class DirEntryTests(TestCase):
+
+    def setUp(self):
+        self.fs = FakeFilesystem()
+        self.fs.files[61] = FakeFile()
+        ref = FileRef(struct.pack('<Q', 61 | 2 << 48))
+        self.sut = DirEntry(self.fs, ref, FileNameHeader(file_name('readme.txt', 40, 123, flags=0x20), 0))
+
+    def test_fields_come_from_the_index(self):
+        self.assertEqual(61, self.sut.inode)
+        self.assertEqual('readme.txt', self.sut.name)
+        self.assertEqual(123, self.sut.size)
+        self.assertEqual(4096, self.sut.allocated_size)
+        self.assertTrue(self.sut.is_file)
+        self.assertEqual(1, self.sut.ctime)
+        self.assertEqual([], self.fs.found)
+
+    def test_directory_flag(self):
+        ref = FileRef(struct.pack('<Q', 40))
+        sut = DirEntry(self.fs, ref, FileNameHeader(file_name('Docs', 5, flags=DIRECTORY), 0))
+
+        self.assertTrue(sut.is_dir)
+
+    def test_other_attributes_read_the_file_once(self):
+        self.assertEqual('/Docs/readme.txt', self.sut.fullpath)
+        self.assertEqual('/Docs/readme.txt', self.sut.fullpath)
+        self.assertEqual([61], self.fs.found)
@@ -0,0 +1,30 @@
+"""Fakes of the disk layer, shared by the tests."""
+from fff.disk import Disk
+
+from typing import List, Tuple
+import struct
+
+
+class MemoryDisk(Disk):
+    """A disk of `data` recording its reads as `(size, offset)`."""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.reads: List[Tuple[int, int]] = []
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    def read(self, size: int, offset: int) -> bytes:
+        self.reads.append((size, offset))
+        return self.data[offset:offset+size]
+
+
+def mbr_disk(volume: bytes, partition_type: int = 0x07, first_sector: int = 64) -> bytes:
+    """A disk whose MBR has one partition, of `partition_type`, holding `volume`."""
+    mbr = bytearray(512)
+    mbr[446:462] = struct.pack('<B3sB3sII', 0x80, b'\x00\x02\x00', partition_type,
+                               b'\xfe\xff\xff', first_sector, len(volume) // 512)
+    mbr[510:512] = b'\x55\xaa'
+    return bytes(mbr).ljust(first_sector * 512, b'\x00') + volume
@@ -0,0 +1,239 @@
+from fff.disk import Disk, FileDisk, RawDisk, SplitDisk, MMapDisk, GzipDisk, ZipDisk
+from fff.disk_view import DiskView
+from fff import DiskImage, zran
+
+from unittest import TestCase, skipUnless
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+import random
+import gzip
+import glob
+import os
+import zipfile
+
+
+def read_concurrently(test: TestCase, disk: Disk, data: bytes, threads: int = 8):
+    def check(seed):
+        r = random.Random(seed)
+        for _ in range(50):
+            offset = r.randrange(len(data))
+            size = r.randrange(1, 1 << 14)
+            test.assertEqual(data[offset:offset+size], bytes(disk.read(size, offset)))
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(check, range(threads * 2)))
+
+
+class DiskTests(TestCase):
+
+    DATA = bytes(range(256)) * 16
+
+    def setUp(self):
+        fd, self.filepath = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(DiskTests.DATA)
+
+    def tearDown(self):
+        os.remove(self.filepath)
+
+    def test_file_disk_read(self):
+        sut = FileDisk(open(self.filepath, 'rb'))
+
+        self.assertEqual(len(DiskTests.DATA), sut.size)
+        self.assertEqual(DiskTests.DATA[100:200], sut.read(100, 100))
+
+        sut.close()
+
+    def test_raw_disk_concurrent_reads(self):
+        sut = RawDisk(self.filepath)
+
+        self.assertEqual(len(DiskTests.DATA), sut.size)
+        read_concurrently(self, sut, DiskTests.DATA)
+
+        sut.close()
+
+    def test_file_disk_concurrent_reads(self):
+        sut = FileDisk(open(self.filepath, 'rb'))
+
+        read_concurrently(self, sut, DiskTests.DATA)
+
+        sut.close()
+
+    def test_mmap_disk_read_is_zero_copy(self):
+        sut = MMapDisk(self.filepath)
+
+        actual = sut.read(100, 100)
+
+        self.assertEqual(len(DiskTests.DATA), sut.size)
+        self.assertIsInstance(actual, memoryview)
+        self.assertEqual(DiskTests.DATA[100:200], actual)
+
+        sut.close()
+
+    def test_disk_view_units_over_mmap(self):
+        disk = MMapDisk(self.filepath)
+        sut = DiskView(disk, 512, 2048, sector_size=512, cluster_size=1024)
+
+        self.assertEqual(DiskTests.DATA[1024:1536], sut.sectors[1])
+        self.assertEqual(DiskTests.DATA[1536:2560], sut.clusters[1])
+        self.assertEqual(DiskTests.DATA[1024:2048], sut.sectors[1:3])
+
+        disk.close()
+
+
+class SplitDiskTests(TestCase):
+
+    DATA = bytes(range(256)) * 16
+    SEGMENT_SIZES = [1000, 1, 0, 1500, 1595]
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filepaths = []
+        offset = 0
+        for i, size in enumerate(SplitDiskTests.SEGMENT_SIZES):
+            filepath = os.path.join(self.directory, 'disk.{:03d}'.format(i + 1))
+            with open(filepath, 'wb') as f:
+                f.write(SplitDiskTests.DATA[offset:offset+size])
+            self.filepaths.append(filepath)
+            offset += size
+
+    def tearDown(self):
+        for f in glob.glob(os.path.join(self.directory, '*')):
+            os.remove(f)
+        os.rmdir(self.directory)
+
+    def test_segments_of(self):
+        self.assertEqual(self.filepaths, SplitDisk.segments_of(self.filepaths[0]))
+        self.assertEqual(self.filepaths[3:], SplitDisk.segments_of(self.filepaths[3]))
+
+        single = os.path.join(self.directory, 'disk.dd')
+        self.assertEqual([single], SplitDisk.segments_of(single))
+
+    def test_reads_across_segments(self):
+        sut = SplitDisk(self.filepaths)
+
+        self.assertEqual(len(SplitDiskTests.DATA), sut.size)
+        self.assertEqual(SplitDiskTests.DATA[990:1010], sut.read(20, 990))
+        self.assertEqual(SplitDiskTests.DATA[1000:1001], sut.read(1, 1000))
+        self.assertEqual(SplitDiskTests.DATA, sut.read(sut.size, 0))
+        self.assertEqual(SplitDiskTests.DATA[-10:], sut.read(100, sut.size - 10))
+        self.assertEqual(b'', sut.read(10, sut.size))
+
+        sut.close()
+
+    def test_mmap_segments(self):
+        sut = SplitDisk(self.filepaths, use_mmap=True)
+
+        self.assertIsInstance(sut.read(20, 1001), memoryview)
+        self.assertEqual(SplitDiskTests.DATA[990:1010], sut.read(20, 990))
+        self.assertEqual(SplitDiskTests.DATA, sut.read(sut.size, 0))
+
+        sut.close()
+
+    def test_concurrent_reads(self):
+        sut = SplitDisk(self.filepaths)
+
+        read_concurrently(self, sut, SplitDiskTests.DATA)
+
+        sut.close()
+
+
+@skipUnless(zran.available(), 'zlib cannot be loaded through ctypes')
+class GzipDiskTests(TestCase):
+
+    DATA = b''.join(bytes([i % 251]) * (i * 37 % 4096) + os.urandom(i % 700)
+                    for i in range(2000))
+
+    def setUp(self):
+        fd, self.filepath = tempfile.mkstemp(suffix='.gz')
+        with os.fdopen(fd, 'wb') as f:
+            half = len(GzipDiskTests.DATA) // 2
+            # Concatenated members, as produced by pigz or `cat a.gz b.gz`
+            f.write(gzip.compress(GzipDiskTests.DATA[:half]))
+            f.write(gzip.compress(GzipDiskTests.DATA[half:]))
+
+    def tearDown(self):
+        os.remove(self.filepath)
+        if os.path.exists(self.filepath + GzipDisk.INDEX_SUFFIX):
+            os.remove(self.filepath + GzipDisk.INDEX_SUFFIX)
+
+    def test_random_reads(self):
+        sut = GzipDisk(self.filepath, span=1 << 16)
+        data = GzipDiskTests.DATA
+
+        self.assertEqual(len(data), sut.size)
+        self.assertTrue(len(sut.index.checkpoints) > 1)
+        for _ in range(100):
+            offset = random.randrange(len(data))
+            size = random.randrange(1, 1 << 17)
+            self.assertEqual(data[offset:offset+size], sut.read(size, offset))
+
+        sut.close()
+
+    def test_concurrent_reads(self):
+        sut = GzipDisk(self.filepath, span=1 << 16)
+
+        read_concurrently(self, sut, GzipDiskTests.DATA)
+
+        sut.close()
+
+    def test_index_is_persisted(self):
+        GzipDisk(self.filepath, span=1 << 16).close()
+
+        sut = GzipDisk(self.filepath)
+        offset = len(GzipDiskTests.DATA) - 1000
+
+        self.assertTrue(os.path.exists(sut.index_path))
+        self.assertEqual(1 << 16, sut.index.span)
+        self.assertEqual(GzipDiskTests.DATA[offset:], sut.read(1000, offset))
+
+        sut.close()
+
+
+@skipUnless(zran.available(), 'zlib cannot be loaded through ctypes')
+class ZipDiskTests(TestCase):
+
+    DATA = GzipDiskTests.DATA
+
+    def setUp(self):
+        fd, self.filepath = tempfile.mkstemp(suffix='.zip')
+        os.close(fd)
+        with zipfile.ZipFile(self.filepath, 'w') as z:
+            z.writestr('README.txt', b'Evidence #1')
+            z.writestr('disk.dd', ZipDiskTests.DATA, compress_type=zipfile.ZIP_DEFLATED)
+            z.writestr('stored.dd', ZipDiskTests.DATA, compress_type=zipfile.ZIP_STORED)
+
+    def tearDown(self):
+        for f in [self.filepath] + glob.glob(self.filepath + '.*' + ZipDisk.INDEX_SUFFIX):
+            os.remove(f)
+
+    def test_default_member_is_first_file(self):
+        sut = ZipDisk(self.filepath)
+
+        self.assertEqual('README.txt', sut.member)
+        self.assertEqual(b'Evidence #1', sut.read(100, 0))
+
+        sut.close()
+
+    def test_random_reads_deflated_and_stored(self):
+        data = ZipDiskTests.DATA
+        for member in ['disk.dd', 'stored.dd']:
+            sut = ZipDisk(self.filepath, member=member, span=1 << 16)
+
+            self.assertEqual(len(data), sut.size)
+            for _ in range(50):
+                offset = random.randrange(len(data))
+                size = random.randrange(1, 1 << 17)
+                self.assertEqual(data[offset:offset+size], sut.read(size, offset))
+            read_concurrently(self, sut, data)
+
+            sut.close()
+
+    def test_archive_without_files(self):
+        with zipfile.ZipFile(self.filepath, 'w') as z:
+            z.writestr('evidence/', b'')
+
+        with self.assertRaises(ValueError):
+            ZipDisk(self.filepath)
+        with self.assertRaises(ValueError):
+            DiskImage(self.filepath)
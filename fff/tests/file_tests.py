@@ -0,0 +1,172 @@
+from fff.ntfs import File, Name, NameIndex
+from fff.ntfs.mft_attr import FileNameHeader
+
+from unittest import TestCase
+from typing import Dict, List
+import io
+
+from .disk_fakes import MemoryDisk
+from .ntfs_fakes import (FakeData, FakeFilesystem, FakeHeader, FakeIndexRoot, FakeMFTEntry,
+                         attribute, file_name, index_entries, index_entry, mft_record)
+
+
+class FileTests(TestCase):
+
+    DATA = bytes(range(256)) * 64
+
+    def setUp(self):
+        self.disk = MemoryDisk(FileTests.DATA)
+        fs = FakeFilesystem(self.disk, 512)
+        # clusters 4-5, 3 sparse clusters, cluster 10
+        header = FakeHeader(b'\x11\x02\x04\x01\x03\x11\x01\x06\x00', 3000)
+        entry = FakeMFTEntry(attrs=[('$DATA', '', FakeData(header))])
+        self.sut = File(entry, fs)  # type: ignore
+        data = FileTests.DATA
+        self.expect = data[2048:3072] + bytes(1536) + data[5120:5632]
+
+    def test_read_holes_without_io(self):
+        actual = b''.join(self.sut.read(count=3000))
+
+        self.assertEqual(self.expect[:3000], actual)
+        self.assertEqual([(1024, 2048), (440, 5120)], self.disk.reads)
+
+    def test_read_skip_across_runs(self):
+        actual = b''.join(self.sut.read(count=3, skip=3, bsize=300))
+
+        self.assertEqual(self.expect[900:1800], actual)
+        self.assertEqual([(124, 2948)], self.disk.reads)
+
+    def test_read_does_not_copy(self):
+        self.disk.data = memoryview(FileTests.DATA)  # type: ignore
+
+        chunks = list(self.sut.read(count=3000))
+
+        self.assertTrue(all(isinstance(c, memoryview) for c in chunks))
+        self.assertIs(FileTests.DATA, chunks[0].obj)  # type: ignore
+        self.assertEqual(self.expect[:3000], b''.join(chunks))
+
+    def test_extents_skip_holes(self):
+        self.assertEqual([(0, 2048, 1024), (2560, 5120, 440)], list(self.sut.extents()))
+
+    def test_open_reads_across_runs(self):
+        with self.sut.open() as f:
+            head = f.read(1000)
+            rest = f.read()
+
+        self.assertEqual(self.expect[:3000], head + rest)
+
+    def test_open_seek(self):
+        f = self.sut.open(buffering=0)
+
+        self.assertEqual(900, f.seek(900))
+        self.assertEqual(self.expect[900:1800], f.read(900))
+        self.assertEqual([(124, 2948)], self.disk.reads)
+        f.seek(-10, io.SEEK_END)
+        self.assertEqual(self.expect[2990:3000], f.read(100))
+        self.assertEqual(b'', f.read(100))
+        f.seek(5000)
+        self.assertEqual(b'', f.read())
+
+    def test_open_readinto(self):
+        f = self.sut.open(buffering=0)
+        f.seek(2500)
+        b = bytearray(100)
+
+        self.assertEqual(100, f.readinto(b))
+        self.assertEqual(self.expect[2500:2600], b)
+
+
+class ResidentFileTests(TestCase):
+
+    DATA = b'resident data'
+
+    def setUp(self):
+        fs = FakeFilesystem(MemoryDisk(b''))
+        fs.mft.records[20] = mft_record(1, attribute(0x30, file_name('inner.txt')) +
+                                        attribute(0x80, ResidentFileTests.DATA))
+        self.sut = File(fs.mft.find(inode=20), fs)
+        self.disk = fs.disk
+
+    def test_size(self):
+        self.assertEqual(len(ResidentFileTests.DATA), self.sut.size)
+
+    def test_read(self):
+        self.assertEqual(ResidentFileTests.DATA, self.sut.data)
+        self.assertEqual(b'dent', b''.join(self.sut.read(count=2, skip=2, bsize=2)))
+        self.assertEqual(b'', b''.join(self.sut.read(count=10, skip=20)))
+
+    def test_open(self):
+        with self.sut.open() as f:
+            self.assertEqual(ResidentFileTests.DATA, f.read())
+            f.seek(9)
+            self.assertEqual(b'data', f.read(100))
+        self.assertEqual([], self.disk.reads)
+
+    def test_open_readinto(self):
+        f = self.sut.open(buffering=0)
+        f.seek(3)
+        b = bytearray(4)
+
+        self.assertEqual(4, f.readinto(b))
+        self.assertEqual(b'iden', b)
+
+    def test_no_extents(self):
+        self.assertEqual([], list(self.sut.extents()))
+
+
+class FileListTests(TestCase):
+
+    # name, inode, parent, namespace
+    NAMES = [
+        ('.', 5, 5, 3),
+        ('Program Files', 60, 5, 1),
+        ('PROGRA~1', 60, 5, 2),
+        ('link.txt', 61, 5, 0),
+        ('readme.txt', 61, 60, 3),
+        ('README.md', 62, 60, 3),
+        ('Long Name.txt', 63, 60, 1),
+        ('LONGNA~1.TXT', 63, 60, 2),
+        ('Empty', 64, 60, 3),
+    ]
+    DIRS = {5, 60, 64}
+
+    def setUp(self):
+        self.fs = FakeFilesystem()
+        entries: Dict[int, List] = {}
+        for name, inode, parent, namespace in FileListTests.NAMES:
+            fn = FileNameHeader(file_name(name, parent, namespace=namespace), 0)
+            entries.setdefault(inode, []).append(('$FILE_NAME', '', fn))
+        for inode, attrs in entries.items():
+            if inode in FileListTests.DIRS:
+                data = b''.join(index_entry(name, i, namespace=namespace)
+                                for name, i, parent, namespace in FileListTests.NAMES
+                                if parent == inode) + index_entry()
+                attrs.append(('$INDEX_ROOT', '$I30', FakeIndexRoot(index_entries(data))))
+            flags = 3 if inode in FileListTests.DIRS else 1
+            self.fs.files[inode] = File(FakeMFTEntry(inode, attrs, flags), self.fs)  # type: ignore
+        self.root = self.fs.files[5]
+        self.index = NameIndex()
+        for n in FileListTests.NAMES:
+            self.index.add(Name(*n))
+
+    def list(self, indexed: bool, **kwargs) -> List[int]:
+        self.fs.mft.name_index = self.index if indexed else None
+        return sorted(f.inode for f in self.root.list(**kwargs))
+
+    def test_indexed_list_matches_scan(self):
+        for kwargs in [dict(pattern='*.txt'), dict(pattern='r*'), dict(pattern='*'),
+                       dict(pattern='*~1*'), dict(regex='ME'), dict(regex='^[A-Z]')]:
+            for recursive in [False, True]:
+                self.assertEqual(self.list(False, recursive=recursive, **kwargs),
+                                 self.list(True, recursive=recursive, **kwargs),
+                                 (kwargs, recursive))
+
+    def test_list_by_pattern(self):
+        # Names are those of File.name, once per index entry.
+        self.assertEqual([61], self.list(True, pattern='*.txt'))
+        self.assertEqual([61, 61, 63, 63], self.list(True, pattern='*.txt', recursive=True))
+        # Patterns match whole names.
+        self.assertEqual([5, 60, 60, 61, 61, 62, 63, 63, 64],
+                         self.list(True, pattern='*', recursive=True))
+        self.assertEqual([62], self.list(True, pattern='R*', recursive=True))
+        self.assertEqual([], self.list(False, pattern='ME*', recursive=True))
@@ -0,0 +1,56 @@
+from fff.ntfs.fixup import apply_fixups, _apply_python, _apply_numpy
+
+from unittest import TestCase, skipUnless
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None  # type: ignore
+
+RECORD_SIZE = 1024
+
+
+def record(fill: int, usn: bytes = b'\x07\x00') -> bytes:
+    """A record of `fill` bytes with its strides protected by `usn`."""
+    r = bytearray([fill]) * RECORD_SIZE
+    r[0:8] = struct.pack('<4sHH', b'FILE', 0x30, RECORD_SIZE // 512 + 1)
+    r[0x30:0x32] = usn
+    for i, end in enumerate(range(510, RECORD_SIZE, 512)):
+        r[0x32+2*i:0x34+2*i] = r[end:end+2]
+        r[end:end+2] = usn
+    return bytes(r)
+
+
+class FixupTests(TestCase):
+
+    def setUp(self):
+        torn = bytearray(record(3))
+        torn[1022:1024] = b'\x03\x03'
+        self.records = [record(1), bytes(RECORD_SIZE), record(2), bytes(torn)]
+
+    def check(self, apply):
+        buf = bytearray(b''.join(self.records * 4))
+
+        bad = apply(buf, RECORD_SIZE)
+
+        self.assertEqual([3, 7, 11, 15], bad)
+        for i in range(0, 16, 4):
+            r = buf[i*RECORD_SIZE:(i+1)*RECORD_SIZE]
+            self.assertEqual(b'\x01\x01', r[510:512])
+            self.assertEqual(b'\x01\x01', r[1022:1024])
+        self.assertEqual(bytes(RECORD_SIZE), buf[RECORD_SIZE:2*RECORD_SIZE])
+        self.assertEqual(self.records[3], buf[3*RECORD_SIZE:4*RECORD_SIZE])
+
+    def test_python(self):
+        self.check(_apply_python)
+
+    @skipUnless(numpy, 'numpy is not installed')
+    def test_numpy(self):
+        self.check(_apply_numpy)
+
+    def test_partial_record_is_ignored(self):
+        buf = bytearray(record(1) + record(2)[:600])
+
+        self.assertEqual([], apply_fixups(buf, RECORD_SIZE))
+        self.assertEqual(record(2)[:600], buf[RECORD_SIZE:])
@@ -0,0 +1,15 @@
+from unittest import TestCase
+import subprocess
+import sys
+
+
+class ImportTests(TestCase):
+
+    def test_import_does_not_load_display_dependencies(self):
+        code = ('import sys, fff; '
+                'print(",".join(m for m in ["IPython", "tabulate", "hexdump", "magic", "numpy"] '
+                'if m in sys.modules))')
+
+        actual = subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+
+        self.assertEqual('', actual)
@@ -0,0 +1,69 @@
+from fff.disk_view import DiskView
+from fff.ntfs.mft_attr import IndexAllocation
+
+from unittest import TestCase
+
+from .disk_fakes import MemoryDisk
+from .ntfs_fakes import (FakeHeader, FakeIndexRoot, FakeMFTEntry, index_entries, index_entry,
+                         index_record)
+
+CLUSTER_SIZE = 1024
+RECORD_SIZE = 2048
+
+
+class IndexAllocationTests(TestCase):
+
+    def setUp(self):
+        data = bytearray(16 * CLUSTER_SIZE)
+        records = {
+            10: index_record(0, index_entry('c', child_vcn=2) + index_entry(), RECORD_SIZE),
+            3: index_record(2, index_entry('a') + index_entry(), RECORD_SIZE),
+            5: index_record(4, index_entry('x') + index_entry(), RECORD_SIZE),
+            12: index_record(8, index_entry('t') + index_entry(), RECORD_SIZE),
+        }
+        # A torn write of the second sector of the record at VCN 8
+        records[12] = records[12][:1022] + b'\x00\x00' + records[12][1024:]
+        for lcn, r in records.items():
+            data[lcn*CLUSTER_SIZE:lcn*CLUSTER_SIZE+RECORD_SIZE] = r
+        self.disk = MemoryDisk(bytes(data))
+        dv = DiskView(self.disk, 0, len(data), cluster_size=CLUSTER_SIZE)
+        entries = index_entries(index_entry('m', child_vcn=0) + index_entry(child_vcn=4))
+        root = FakeIndexRoot(entries, RECORD_SIZE)
+        entry = FakeMFTEntry(attrs=[('$INDEX_ROOT', '$I30', root)], flags=3, dv=dv)
+        # VCN 0-1 at LCN 10, VCN 2-5 at LCN 3, VCN 6-7 sparse, VCN 8-9 at LCN 12
+        header = FakeHeader(b'\x11\x02\x0A\x11\x04\xF9\x01\x02\x11\x02\x09\x00',
+                            type_id=0xA0, name='$I30')
+        self.sut = IndexAllocation(entry, header, None, None)  # type: ignore
+
+    def names(self, vcn: int):
+        return [e.filename.filename for e in self.sut.record(vcn).entries if not e.is_last]
+
+    def test_nothing_is_read_up_front(self):
+        self.assertEqual([], self.disk.reads)
+
+    def test_record_is_read_through_the_data_runs(self):
+        self.assertEqual(['x'], self.names(4))
+        self.assertEqual([(RECORD_SIZE, 5 * CLUSTER_SIZE)], self.disk.reads)
+
+    def test_records_walk_the_whole_tree(self):
+        actual = self.sut.records
+
+        self.assertEqual([0, 2, 4], list(actual))
+        self.assertEqual(['c'], self.names(0))
+        self.assertEqual(['a'], self.names(2))
+
+    def test_records_are_read_once(self):
+        self.sut.record(2)
+        self.sut.records
+        self.sut.records
+
+        self.assertEqual(3, len(self.disk.reads))
+
+    def test_torn_records_are_marked(self):
+        self.assertEqual(['x'], self.names(4))
+        self.assertEqual(['t'], self.names(8))
+        self.assertEqual({8}, self.sut.torn)
+
+    def test_sparse_record(self):
+        with self.assertRaises(ValueError):
+            self.sut.record(6)
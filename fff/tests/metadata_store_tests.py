@@ -0,0 +1,62 @@
+from fff.ntfs import Allocation, ClusterIndex, Name, NameIndex
+from fff.ntfs.metadata_store import MetadataStore
+
+from unittest import TestCase
+import os
+import tempfile
+
+
+class MetadataStoreTests(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'metadata.db')
+        self.sut = MetadataStore(self.path)
+
+    def tearDown(self):
+        self.sut.close()
+        self.dir.cleanup()
+
+    def test_names_round_trip(self):
+        index = NameIndex()
+        index.add(Name('Program Files', 60, 5, 1))
+        index.add(Name('readme.txt', 61, 60, 3))
+        self.sut.save_names('volume', index)
+        self.sut.close()
+
+        actual = MetadataStore(self.path).load_names('volume')
+
+        assert actual
+        self.assertEqual(list(index), list(actual))
+        self.assertTrue(actual.is_under(61, 5))
+
+    def test_clusters_round_trip(self):
+        a = Allocation(100, 50, 1, 0x80, '', 0)
+        b = Allocation(10, 5, 2, 0xA0, '$I30', 3)
+        self.sut.save_clusters('volume', ClusterIndex([a, b]))
+
+        actual = self.sut.load_clusters('volume')
+
+        assert actual
+        self.assertEqual([b, a], actual.allocations)
+        self.assertEqual([a], actual.at(120))
+
+    def test_save_replaces_the_index_of_the_volume(self):
+        first = NameIndex()
+        first.add(Name('old', 60, 5, 1))
+        second = NameIndex()
+        second.add(Name('new', 61, 5, 1))
+
+        self.sut.save_names('volume', first)
+        self.sut.save_names('volume', second)
+
+        self.assertEqual(list(second), list(self.sut.load_names('volume') or []))
+
+    def test_missing_volume(self):
+        self.sut.save_names('volume', NameIndex())
+
+        self.assertIsNone(self.sut.load_names('other'))
+        self.assertIsNone(self.sut.load_clusters('volume'))
+        empty = self.sut.load_names('volume')
+        self.assertIsNotNone(empty)
+        self.assertEqual(0, len(empty))  # type: ignore
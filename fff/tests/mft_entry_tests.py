@@ -0,0 +1,69 @@
+from unittest import TestCase
+import struct
+
+from .ntfs_fakes import FakeFilesystem, attribute, attribute_list, file_name, mft_record
+
+
+class MFTEntryTests(TestCase):
+
+    def setUp(self):
+        self.mft = FakeFilesystem().mft
+        si = attribute(0x10, struct.pack('<QQQQ', 1, 2, 3, 4) + bytes(16))
+        self.mft.records = {
+            20: mft_record(1, si + attribute(0x30, file_name('resident.txt')) +
+                           attribute(0x80, b'hello')),
+            30: mft_record(1, attribute(0x20, attribute_list((0x10, 30, ''), (0x30, 30, ''),
+                                                             (0x80, 31, ''), (0x80, 32, 'ads'))) +
+                           attribute(0x30, file_name('extended.txt'))),
+            31: mft_record(1, attribute(0x80, b'data'), base=30),
+            32: mft_record(1, attribute(0x80, b'stream', name='ads'), base=30),
+        }
+
+    def decoded(self, entry):
+        return sorted(entry.headers[i].type_id for i in entry._decoded)
+
+    def test_nothing_is_decoded_up_front(self):
+        entry = self.mft.find(inode=20)
+
+        self.assertEqual([0x10, 0x30, 0x80], [h.type_id for h in entry.headers])
+        self.assertEqual([], self.decoded(entry))
+
+    def test_only_the_requested_type_is_decoded(self):
+        entry = self.mft.find(inode=20)
+
+        names = entry.attrs(type_id='$FILE_NAME')
+
+        self.assertEqual(['resident.txt'], [a.filename for a in names])
+        self.assertEqual([0x30], self.decoded(entry))
+        self.assertIs(names[0], entry.attr(type_id=0x30))
+
+    def test_extensions_are_not_read_for_attributes_of_the_base_entry(self):
+        entry = self.mft.find(inode=30)
+
+        names = entry.attrs(type_id='$FILE_NAME')
+
+        self.assertEqual(['extended.txt'], [a.filename for a in names])
+        self.assertEqual([0x20, 0x30], self.decoded(entry))
+        self.assertEqual([30], self.mft.found)
+
+    def test_only_extensions_holding_the_requested_attributes_are_read(self):
+        entry = self.mft.find(inode=30)
+
+        data = entry.attrs(type_id='$DATA', name='')
+
+        self.assertEqual([''], [a.name for a in data])
+        self.assertEqual([30, 31], self.mft.found)
+
+        streams = entry.attrs(type_id=0x80)
+
+        self.assertEqual(['', 'ads'], [a.name for a in streams])
+        self.assertEqual([30, 31, 32], self.mft.found)
+
+    def test_extensions_are_read_once(self):
+        entry = self.mft.find(inode=30)
+
+        entry.attrs(type_id='$DATA')
+        entry.attrs(type_id='$DATA')
+
+        self.assertEqual([30, 31, 32], self.mft.found)
+        self.assertEqual([31, 32], [e.inode for e in entry.extensions])
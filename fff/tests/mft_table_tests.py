@@ -0,0 +1,74 @@
+from unittest import TestCase, skipUnless
+import struct
+
+from fff.disk_view import DiskView
+from fff.ntfs.ntfs import NTFS
+
+from .disk_fakes import MemoryDisk
+from .ntfs_fakes import attribute, file_name, mft_record, ntfs_volume
+
+try:
+    import numpy as np
+    from fff.ntfs.mft_table import MFTTable, _parse
+except ImportError:
+    np = None  # type: ignore
+
+RECORD_SIZE = 1024
+
+
+@skipUnless(np, 'numpy is not installed')
+class MFTTableTests(TestCase):
+
+    def setUp(self):
+        si = attribute(0x10, struct.pack('<QQQQ', 1, 2, 3, 4) + bytes(16))
+        records = [
+            mft_record(1, si + attribute(0x30, file_name('PROGRA~1.TXT', namespace=2)) +
+                       attribute(0x30, file_name('Program.txt')) + attribute(0x80, b'hello')),
+            bytes(RECORD_SIZE),
+            mft_record(3, attribute(0x30, file_name('dir', parent=40, namespace=0))),
+        ]
+        self.buf = np.frombuffer(b''.join(records), dtype=np.uint8).reshape(3, RECORD_SIZE)
+
+    def test_parse(self):
+        actual = _parse(self.buf, 100)
+
+        self.assertEqual([100, 101, 102], list(actual['inode']))
+        self.assertEqual([True, False, True], list(actual['valid']))
+        self.assertEqual([1, 0, 3], list(actual['flags']))
+        self.assertEqual([7, 0, 7], list(actual['seq']))
+        self.assertEqual([1, 2, 3, 4], [actual[0][c] for c in ['ctime', 'atime', 'mtime', 'rtime']])
+        self.assertEqual([5, 0, 40], list(actual['parent']))
+        self.assertEqual([1, 0, 0], list(actual['namespace']))
+        self.assertEqual([5, 0, 0], list(actual['size']))
+
+    def test_primary_name_offset(self):
+        actual = _parse(self.buf, 0)[0]
+
+        begin = int(actual['name_offset'])
+        name = self.buf[0, begin:begin+2*int(actual['name_length'])].tobytes()
+        self.assertEqual('Program.txt', name.decode('utf-16-le'))
+
+    def test_file_name_must_fit_in_its_attribute(self):
+        body = bytearray(file_name('long.txt'))
+        body[64] = 200
+        buf = np.frombuffer(mft_record(1, attribute(0x30, bytes(body))),
+                            dtype=np.uint8).reshape(1, RECORD_SIZE)
+
+        actual = _parse(buf, 0)[0]
+
+        self.assertTrue(actual['valid'])
+        self.assertEqual(0, actual['name_offset'])
+        self.assertEqual(0, actual['parent'])
+
+    def test_torn_entries_are_invalid(self):
+        records = {i: mft_record(1, attribute(0x30, file_name('f{}'.format(i))))
+                   for i in range(16, 20)}
+        # A torn write of the first sector of entry 17
+        records[17] = records[17][:510] + b'\x00\x00' + records[17][512:]
+        volume = ntfs_volume(records)
+        fs = NTFS(DiskView(MemoryDisk(volume), 0, len(volume)), volume[:512], None)
+
+        actual = MFTTable.build(fs.mft).array
+
+        self.assertEqual([True, False, True, True], list(actual['valid'][16:20]))
+        self.assertEqual([5, 0, 5, 5], list(actual['parent'][16:20]))
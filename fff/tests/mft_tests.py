@@ -0,0 +1,61 @@
+from fff.disk_view import DiskView
+from fff.ntfs.ntfs import NTFS
+
+from unittest import TestCase
+
+from .disk_fakes import MemoryDisk
+from .ntfs_fakes import VOLUME_CLUSTER_SIZE, attribute, file_name, mft_record, ntfs_volume
+
+MFT_OFFSET = 16 * VOLUME_CLUSTER_SIZE
+
+
+class MFTTests(TestCase):
+
+    def setUp(self):
+        records = {i: mft_record(1, attribute(0x30, file_name('f{}'.format(i))))
+                   for i in range(16, 600)}
+        volume = ntfs_volume(records, total_clusters=640)
+        self.disk = MemoryDisk(volume)
+        self.fs = NTFS(DiskView(self.disk, 0, len(volume)), volume[:512], None)
+        self.sut = self.fs.mft
+        self.sut.clear()
+        self.disk.reads.clear()
+
+    def test_entries_are_read_a_window_at_a_time(self):
+        actual = self.sut.record(300)
+
+        window = self.sut.window_size
+        self.assertEqual(b'FILE', actual[:4])
+        self.assertEqual(set(), self.sut.torn)
+        self.assertEqual([(window, MFT_OFFSET + window)], self.disk.reads)
+
+    def test_windows_are_kept(self):
+        self.sut.record(300)
+        self.sut.record(301)
+
+        self.assertEqual(1, len(self.disk.reads))
+        self.assertEqual([1], list(self.sut._windows))
+
+    def test_window_count_bounds_the_windows_kept(self):
+        self.sut.window_count = 1
+
+        self.sut.record(10)
+        self.sut.record(300)
+        self.sut.record(10)
+
+        self.assertEqual([0], list(self.sut._windows))
+        self.assertEqual(3, len(self.disk.reads))
+
+    def test_without_windows_only_the_entry_is_read(self):
+        self.sut.window_count = 0
+
+        actual = self.sut.record(300)
+
+        self.assertEqual(b'FILE', actual[:4])
+        self.assertEqual([(self.sut.record_size, MFT_OFFSET + 300 * self.sut.record_size)],
+                         self.disk.reads)
+
+    def test_find_parses_the_entry(self):
+        actual = self.fs.find(inode=300)
+
+        self.assertEqual('f300', actual.name)
@@ -0,0 +1,35 @@
+from fff.ntfs import NameIndex, Name
+
+from unittest import TestCase
+
+
+class NameIndexTests(TestCase):
+
+    def setUp(self):
+        self.sut = NameIndex()
+        self.sut.add(Name('.', 5, 5, 3))
+        self.sut.add(Name('Program Files', 60, 5, 1))
+        self.sut.add(Name('PROGRA~1', 60, 5, 2))
+        self.sut.add(Name('readme.txt', 61, 60, 3))
+        self.sut.add(Name('README.md', 62, 60, 3))
+        self.sut.add(Name('link.txt', 61, 5, 0))
+
+    def test_find_is_case_insensitive(self):
+        self.assertEqual([61], [n.inode for n in self.sut.find('README.TXT')])
+        self.assertEqual([], self.sut.find('README.TXT', case_sensitive=True))
+        self.assertEqual([60], [n.inode for n in self.sut.find('progra~1')])
+
+    def test_startswith(self):
+        actual = self.sut.startswith('read')
+
+        self.assertEqual(['README.md', 'readme.txt'], [n.name for n in actual])
+
+    def test_glob_and_search(self):
+        self.assertEqual({61}, {n.inode for n in self.sut.glob('*.TXT')})
+        self.assertEqual({62}, {n.inode for n in self.sut.glob('R*', case_sensitive=True)})
+        self.assertEqual({60}, {n.inode for n in self.sut.search('files$')})
+
+    def test_hard_links_are_under_all_parents(self):
+        self.assertTrue(self.sut.is_under(61, 60))
+        self.assertTrue(self.sut.is_under(61, 5))
+        self.assertFalse(self.sut.is_under(60, 61))
@@ -0,0 +1,262 @@
+"""Builders of NTFS structures, and fakes of the objects around them, shared by the NTFS tests."""
+from fff.disk_view import DiskView
+from fff.ntfs import VCN
+from fff.ntfs.fixup import apply_fixups
+from fff.ntfs.mft_attr import IndexEntryFileName
+from fff.ntfs.mft_entry import MFTEntry
+
+from typing import Any, Dict, List, Optional, Tuple
+import struct
+
+from .disk_fakes import MemoryDisk
+
+DIRECTORY = 0x10000000  # in the flags of $FILE_NAME
+
+TYPES = {'$FILE_NAME': 0x30, '$DATA': 0x80, '$INDEX_ROOT': 0x90, '$INDEX_ALLOCATION': 0xA0}
+
+
+def file_name(name: str, parent: int = 5, size: int = 0, flags: int = 0,
+              namespace: int = 1) -> bytes:
+    """The body of a $FILE_NAME attribute, also the key of an $I30 index entry."""
+    return (struct.pack('<QQQQQQQII', parent, 1, 2, 3, 4, 4096, size, flags, 0) +
+            bytes([len(name), namespace]) + name.encode('utf-16-le'))
+
+
+def index_entry(name: Optional[str] = None, inode: int = 0, child_vcn: Optional[int] = None,
+                **kwargs) -> bytes:
+    """An $I30 index entry of `name`, or the last entry of a node without one."""
+    content = file_name(name, **kwargs) if name is not None else b''
+    size = (16 + len(content) + 7) // 8 * 8 + (8 if child_vcn is not None else 0)
+    flags = (1 if child_vcn is not None else 0) | (2 if name is None else 0)
+    e = struct.pack('<QHHI', inode, size, len(content), flags)
+    e = (e + content).ljust(size - (8 if child_vcn is not None else 0), b'\x00')
+    return e + (struct.pack('<Q', child_vcn) if child_vcn is not None else b'')
+
+
+def index_entries(data: bytes) -> List[IndexEntryFileName]:
+    """Parses the index entries in `data`, up to the last one."""
+    entries = [IndexEntryFileName(data, 0)]
+    while not entries[-1].is_last:
+        entries.append(IndexEntryFileName(data, sum(e.size for e in entries)))
+    return entries
+
+
+def _update_sequence(r: bytearray, offset: int) -> bytes:
+    """Moves the last two bytes of each stride of `r` to the update sequence array at `offset`."""
+    r[offset:offset+2] = b'\x09\x00'
+    for i, end in enumerate(range(510, len(r), 512)):
+        r[offset+2+2*i:offset+4+2*i] = r[end:end+2]
+        r[end:end+2] = b'\x09\x00'
+    return bytes(r)
+
+
+def index_record(vcn: int, entries: bytes, record_size: int) -> bytes:
+    """An INDX record of `entries` at `vcn`, with its update sequence applied."""
+    strides = record_size // 512
+    r = bytearray(struct.pack('<4sHHQQ', b'INDX', 0x28, strides + 1, 0, vcn))
+    r += struct.pack('<IIII', 0x40 - 0x18, 0x40 - 0x18 + len(entries), record_size - 0x18, 1)
+    r = (r.ljust(0x40, b'\x00') + entries).ljust(record_size, b'\x00')
+    return _update_sequence(r, 0x28)
+
+
+def attribute(type_id: int, body: bytes, name: str = '') -> bytes:
+    """A resident attribute of `type_id` holding `body`."""
+    content = (24 + 2 * len(name) + 7) // 8 * 8
+    size = (content + len(body) + 7) // 8 * 8
+    header = struct.pack('<IIBBHHHIHBB', type_id, size, 0, len(name), 24, 0, 0, len(body),
+                         content, 0, 0)
+    r = (header + name.encode('utf-16-le')).ljust(content, b'\x00') + body
+    return r.ljust(size, b'\x00')
+
+
+def attribute_list(*entries: Tuple[int, int, str]) -> bytes:
+    """The body of an $ATTRIBUTE_LIST of `(type_id, inode, name)` entries."""
+    r = b''
+    for type_id, inode, name in entries:
+        size = (26 + 2 * len(name) + 7) // 8 * 8
+        e = struct.pack('<IHBBQQH', type_id, size, len(name), 26, 0, inode, 0)
+        r += (e + name.encode('utf-16-le')).ljust(size, b'\x00')
+    return r
+
+
+def mft_record(flags: int, attrs: bytes, base: int = 0, record_size: int = 1024) -> bytes:
+    """An MFT entry holding `attrs`, with its update sequence applied."""
+    count = record_size // 512 + 1
+    attr_offset = (48 + 2 * count + 7) // 8 * 8
+    attrs += b'\xff\xff\xff\xff'
+    header = struct.pack('<4sHHQHHHHIIQH', b'FILE', 48, count, 0, 7, 1, attr_offset, flags,
+                         attr_offset + len(attrs), record_size, base, 3)
+    r = (header.ljust(attr_offset, b'\x00') + attrs).ljust(record_size, b'\x00')
+    return _update_sequence(bytearray(r), 48)
+
+
+def data_runs(*runs: Tuple[int, Optional[int]]) -> bytes:
+    """The data runs of `(length, lcn)` extents, where `lcn` is None for sparse ones."""
+    r = b''
+    prev = 0
+    for length, lcn in runs:
+        if lcn is None:
+            r += b'\x04' + struct.pack('<I', length)
+        else:
+            r += b'\x44' + struct.pack('<Ii', length, lcn - prev)
+            prev = lcn
+    return r + b'\x00'
+
+
+def non_resident_attribute(type_id: int, runs: bytes, size: int, name: str = '') -> bytes:
+    """A non-resident attribute of `type_id` holding `size` bytes in `runs`, see `data_runs`."""
+    offset = (0x40 + 2 * len(name) + 7) // 8 * 8
+    length = (offset + len(runs) + 7) // 8 * 8
+    header = struct.pack('<IIBBHHHQQHHIQQQ', type_id, length, 1, len(name), 0x40, 0, 0, 0,
+                         len(VCN(runs)) - 1, offset, 0, 0, size, size, size)
+    r = (header + name.encode('utf-16-le')).ljust(offset, b'\x00') + runs
+    return r.ljust(length, b'\x00')
+
+
+VOLUME_CLUSTER_SIZE = 1024  # of the volumes of `ntfs_volume`, and the size of their MFT entries
+
+
+def ntfs_volume(records: Dict[int, bytes], clusters: Optional[Dict[int, bytes]] = None,
+                total_clusters: int = 64, mft_lcn: int = 16) -> bytes:
+    """
+    An NTFS volume whose MFT, at `mft_lcn`, holds `records` by inode, and whose
+    clusters hold `clusters` by LCN.
+
+    Entry 0, $MFT, is added, and entry 5, the root directory, unless it is in
+    `records`.
+    """
+    cs = VOLUME_CLUSTER_SIZE
+    records = dict(records)
+    records.setdefault(5, mft_record(3, attribute(0x30, file_name('.', flags=DIRECTORY))))
+    n = max(records) + 1
+    records[0] = mft_record(1, attribute(0x30, file_name('$MFT', size=n * cs)) +
+                            non_resident_attribute(0x80, data_runs((n, mft_lcn)), n * cs))
+
+    bs = bytearray(512)
+    bs[0:11] = b'\xeb\x52\x90NTFS    '
+    bs[11:14] = struct.pack('<HB', 512, cs // 512)
+    bs[0x28:0x50] = struct.pack('<QQQbxxxbxxxQ', total_clusters * cs // 512 - 1, mft_lcn, 2,
+                                1, 4, 0x1234ABCD5678EF00)
+    bs[0x1FE:0x200] = b'\x55\xaa'
+
+    data = bytearray(total_clusters * cs)
+    data[0:512] = bs
+    for inode, r in records.items():
+        data[mft_lcn*cs+inode*cs:mft_lcn*cs+(inode+1)*cs] = r
+    for lcn, c in (clusters or {}).items():
+        data[lcn*cs:lcn*cs+len(c)] = c
+    assert len(data) == total_clusters * cs
+    return bytes(data)
+
+
+class FakeRef(object):
+    def __init__(self, inode: int = 0):
+        self.inode = inode
+
+
+class FakeHeader(object):
+    """The header of a non-resident attribute."""
+
+    non_resident = True
+
+    def __init__(self, data_runs: bytes, actual_size: int = 0, type_id: int = 0x80,
+                 name: str = '', starting_vcn: int = 0):
+        self.vcn = VCN(data_runs)
+        self.actual_size = actual_size
+        self.type_id = type_id
+        self.name = name
+        self.starting_vcn = starting_vcn
+        self.last_vcn = starting_vcn + len(self.vcn) - 1
+
+
+class FakeData(object):
+    def __init__(self, header: FakeHeader):
+        self.header = header
+
+
+class FakeIndexRoot(object):
+    def __init__(self, entries: List[IndexEntryFileName], bytes_per_index_record: int = 4096):
+        self.entries = entries
+        self.bytes_per_index_record = bytes_per_index_record
+
+
+class FakeMFTEntry(object):
+    """
+    An MFT entry holding `attrs`, `(type, name, attr)` tuples where `type` is
+    the name of the attribute type, e.g. "$DATA".
+    """
+
+    def __init__(self, inode: int = 0, attrs: Optional[List[Tuple[str, str, Any]]] = None,
+                 flags: int = 1, dv: Optional[DiskView] = None):
+        self.inode = inode
+        self.flags = flags
+        self.dv = dv
+        self.base_ref = FakeRef()
+        self.extensions: List[FakeMFTEntry] = []
+        self._attrs = attrs or []
+
+    @property
+    def is_file(self):
+        return self.flags == 0x01
+
+    @property
+    def is_dir(self):
+        return self.flags & 2 != 0
+
+    @property
+    def in_use(self):
+        return self.flags != 0
+
+    def attrs(self, type_id=None, name=None) -> List[Any]:
+        if isinstance(type_id, int):
+            type_id = next(k for k, v in TYPES.items() if v == type_id)
+        return [a for t, n, a in self._attrs
+                if (type_id is None or t == type_id) and (name is None or n == name)]
+
+    def attr(self, type_id=None, name=None) -> Any:
+        r = self.attrs(type_id=type_id, name=name)
+        return r[0] if r else None
+
+
+class FakeMFT(object):
+    """An MFT of the entries in `records`, where `find` records the inodes it parses."""
+
+    def __init__(self, fs: 'FakeFilesystem', entry_total: int = 0):
+        self.fs = fs
+        self.entry_total = entry_total
+        self.name_index = None
+        self.records: Dict[int, bytes] = {}
+        self.found: List[int] = []
+
+    def find(self, inode: int) -> MFTEntry:
+        self.found.append(inode)
+        data = bytearray(self.records[inode])
+        apply_fixups(data, len(data))
+        return MFTEntry(bytes(data), self.fs.dv, inode, self)  # type: ignore
+
+    @property
+    def has_name_index(self) -> bool:
+        return self.name_index is not None
+
+
+class FakeFilesystem(object):
+    """A filesystem reading `disk`, where `find` returns what is put in `files`."""
+
+    image = None
+    upcase = None
+    dv: Any = None
+
+    def __init__(self, disk: Optional[MemoryDisk] = None, cluster_size: int = 512):
+        self.disk = disk
+        self.cluster_size = cluster_size
+        self.mft = FakeMFT(self)
+        self.files: Dict[int, Any] = {}
+        self.found: List[int] = []
+
+    def read(self, size: int, offset: int) -> bytes:
+        assert self.disk
+        return self.disk.read(size, offset)
+
+    def find(self, inode: int) -> Any:
+        self.found.append(inode)
+        return self.files.get(inode)
@@ -59,10 +59,10 @@ class NTFSTests(TestCase):
         self.assertEqual(16, header.vcn.drs[0].offset)
 
     def test_read_mft_first_5_bytes(self):
-        actual0 = next(self.sut.mft.read(skip=0, bsize=1, count=5)).decode()
-        actual1 = next(self.sut.mft.read(skip=0, bsize=5, count=1)).decode()
-        actual2 = next(self.sut.mft.read(skip=1, bsize=1, count=4)).decode()
-        actual3 = next(self.sut.mft.read(skip=1, bsize=2, count=1)).decode()
+        actual0 = bytes(next(self.sut.mft.read(skip=0, bsize=1, count=5))).decode()
+        actual1 = bytes(next(self.sut.mft.read(skip=0, bsize=5, count=1))).decode()
+        actual2 = bytes(next(self.sut.mft.read(skip=1, bsize=1, count=4))).decode()
+        actual3 = bytes(next(self.sut.mft.read(skip=1, bsize=2, count=1))).decode()
         actual4 = b''.join(self.sut.mft.read(skip=1, bsize=3, count=1)).decode()
 
         self.assertEqual('FILE0', actual0)
@@ -72,6 +72,26 @@ class NTFSTests(TestCase):
         self.assertEqual(3, len(actual4))
         self.assertEqual('E0', actual4[:2])
 
+    def test_mft_entries_are_read_on_demand(self):
+        mft = self.sut.mft
+        mft.clear()
+
+        actual = mft.record(200)
+
+        self.assertEqual(mft.record_size, len(actual))
+        self.assertEqual(b'FILE', actual[:4])
+        self.assertEqual(1, len(mft._windows))
+
+    def test_mft_entry_decodes_attributes_on_demand(self):
+        entry = fff.ntfs.MFTEntry(self.sut.mft.record(200), self.sut.dv, 200, self.sut.mft)
+
+        self.assertEqual(0, len(entry._decoded))
+
+        names = entry.attrs(type_id='$FILE_NAME')
+
+        self.assertEqual(len(names), len(entry._decoded))
+        self.assertIs(names[0], entry.attr(type_id='$FILE_NAME'))
+
     def test_slack_space_inode_132(self):
         f = self.sut.find(inode=132)
 
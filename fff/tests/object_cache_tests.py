@@ -0,0 +1,48 @@
+from fff.object_cache import ObjectCache
+
+from unittest import TestCase
+import gc
+
+
+class Entry(object):
+    def __init__(self, key: int):
+        self.key = key
+
+
+class ObjectCacheTests(TestCase):
+
+    def test_least_recently_used_are_evicted(self):
+        sut = ObjectCache(capacity=2)
+
+        sut.put(1, Entry(1))
+        sut.put(2, Entry(2))
+        sut.get(1)
+        sut.put(3, Entry(3))
+        gc.collect()
+
+        self.assertIsNotNone(sut.get(1))
+        self.assertIsNone(sut.get(2))
+        self.assertIsNotNone(sut.get(3))
+        self.assertEqual(1, sut.stats.evictions)
+        self.assertEqual(1, sut.stats.misses)
+
+    def test_live_objects_keep_their_identity(self):
+        sut = ObjectCache(capacity=1)
+        first = sut.put(1, Entry(1))
+
+        sut.put(2, Entry(2))
+        gc.collect()
+
+        self.assertIs(first, sut.get(1))
+        self.assertIs(first, sut.put(1, Entry(1)))
+
+    def test_shrink_capacity(self):
+        sut = ObjectCache(capacity=10)
+        for i in range(10):
+            sut.put(i, Entry(i))
+
+        sut.capacity = 3
+        gc.collect()
+
+        self.assertEqual(3, len(sut))
+        self.assertEqual(7, sut.stats.evictions)
@@ -0,0 +1,134 @@
+from fff import DiskImage, zran
+from fff.ntfs import parallel
+from fff.ntfs.cluster_index import ClusterIndex
+from fff.ntfs.name_index import NameIndex
+
+from unittest import TestCase, skipUnless
+import gzip
+import os
+import tempfile
+
+from .disk_fakes import mbr_disk
+from .ntfs_fakes import (FakeFilesystem, FakeMFT, attribute, data_runs, file_name, mft_record,
+                         non_resident_attribute, ntfs_volume)
+
+try:
+    import numpy as np
+    from fff.ntfs.mft_table import MFTTable
+except ImportError:
+    np = None  # type: ignore
+
+
+def span(mft, first: int, count: int):
+    return (first, count)
+
+
+class ParallelTests(TestCase):
+
+    def test_ranges(self):
+        self.assertEqual([(0, 4), (4, 4), (8, 2)], parallel.ranges(10, 4))
+        self.assertEqual([], parallel.ranges(0, 4))
+
+    def test_without_image_parse_in_process(self):
+        mft = FakeMFT(FakeFilesystem(), 10)
+
+        actual = parallel.map_entries(mft, span, workers=4, chunk_entries=4)
+
+        self.assertEqual([(0, 4), (4, 4), (8, 2)], actual)
+
+
+def pid(mft, first: int, count: int):
+    return os.getpid()
+
+
+class WorkerTests(TestCase):
+    """Parse the MFT of an image written to a temporary directory, in worker processes."""
+
+    tmp: tempfile.TemporaryDirectory
+    data: bytes
+    path: str
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        records = {}
+        for inode in range(16, 200):
+            attrs = attribute(0x30, file_name('f{}.txt'.format(inode), namespace=inode % 4))
+            if inode % 3:
+                attrs += attribute(0x80, b'data')
+            else:
+                attrs += non_resident_attribute(0x80, data_runs((2, 300 + 2 * inode)), 2048)
+            records[inode] = mft_record(1, attrs)
+        cls.data = mbr_disk(ntfs_volume(records, total_clusters=720))
+        cls.path = os.path.join(cls.tmp.name, 'ntfs.dd')
+        with open(cls.path, 'wb') as f:
+            f.write(cls.data)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def open(self, path: str, **kwargs):
+        image = DiskImage(path, **kwargs)
+        self.addCleanup(image.close)
+        return image.volume.partitions[0].filesystem.mft
+
+    def test_name_index(self):
+        mft = self.open(self.path)
+
+        expected = sorted(NameIndex.build(mft, workers=0, chunk_entries=64))
+        actual = sorted(NameIndex.build(mft, workers=2, chunk_entries=64))
+
+        self.assertEqual(186, len(expected))
+        self.assertEqual(expected, actual)
+
+    def test_cluster_index(self):
+        mft = self.open(self.path)
+
+        expected = ClusterIndex.build(mft, workers=0, chunk_entries=64).allocations
+        actual = ClusterIndex.build(mft, workers=2, chunk_entries=64).allocations
+
+        self.assertEqual(62, len(expected))
+        self.assertEqual(expected, actual)
+
+    @skipUnless(np, 'numpy is not installed')
+    def test_mft_table(self):
+        mft = self.open(self.path)
+
+        expected = MFTTable.build(mft, chunk_size=64 << 10, workers=0).array
+        actual = MFTTable.build(mft, chunk_size=64 << 10, workers=2).array
+
+        self.assertEqual(200, len(expected))
+        self.assertEqual(expected.tobytes(), actual.tobytes())
+
+    def test_ranges_are_parsed_in_workers(self):
+        mft = self.open(self.path)
+
+        actual = parallel.map_entries(mft, pid, workers=2, chunk_entries=64)
+
+        self.assertNotIn(os.getpid(), actual)
+
+    def gzip_image(self) -> str:
+        path = os.path.join(self.tmp.name, 'ntfs.dd.gz')
+        with gzip.open(path, 'wb') as f:
+            f.write(self.data)
+        return path
+
+    @skipUnless(zran.available(), 'zlib cannot be loaded through ctypes')
+    def test_workers_load_the_persisted_index(self):
+        index_path = os.path.join(self.tmp.name, 'ntfs.fffidx')
+        mft = self.open(self.gzip_image(), index_path=index_path)
+
+        actual = parallel.map_entries(mft, pid, workers=2, chunk_entries=64)
+
+        self.assertTrue(os.path.exists(index_path))
+        self.assertNotIn(os.getpid(), actual)
+
+    @skipUnless(zran.available(), 'zlib cannot be loaded through ctypes')
+    def test_without_a_persisted_index_parse_in_process(self):
+        index_path = os.path.join(self.tmp.name, 'missing', 'ntfs.fffidx')
+        mft = self.open(self.gzip_image(), index_path=index_path)
+
+        actual = parallel.map_entries(mft, pid, workers=2, chunk_entries=64)
+
+        self.assertEqual([os.getpid()] * 4, actual)
@@ -0,0 +1,59 @@
+from fff.readahead import Readahead
+
+from unittest import TestCase
+import random
+
+from .disk_fakes import MemoryDisk
+from .disk_tests import read_concurrently
+
+
+class ReadaheadTests(TestCase):
+
+    DATA = bytes(random.getrandbits(8) for _ in range(1 << 20))
+
+    def setUp(self):
+        self.disk = MemoryDisk(ReadaheadTests.DATA)
+
+    def test_sequential_reads_grow_window(self):
+        sut = Readahead(self.disk, max_window=64 << 10, min_window=8 << 10)
+        data = ReadaheadTests.DATA
+
+        for offset in range(0, 256 << 10, 512):
+            self.assertEqual(data[offset:offset+512], sut.read(512, offset))
+
+        sizes = [size for size, _ in self.disk.reads]
+        self.assertEqual([512, 8 << 10, 16 << 10, 32 << 10, 64 << 10, 64 << 10], sizes[:6])
+        self.assertTrue(len(self.disk.reads) < 10)
+
+    def test_random_reads_pass_through(self):
+        sut = Readahead(self.disk, max_window=64 << 10, min_window=8 << 10)
+
+        for offset in [9000, 100, 700000, 5000, 300000]:
+            sut.read(100, offset)
+
+        self.assertEqual([100] * 5, [size for size, _ in self.disk.reads])
+
+    def test_interleaved_streams(self):
+        sut = Readahead(self.disk, max_window=64 << 10, min_window=8 << 10)
+        data = ReadaheadTests.DATA
+
+        for i in range(0, 64 << 10, 1024):
+            for begin in [0, 512 << 10]:
+                offset = begin + i
+                self.assertEqual(data[offset:offset+1024], sut.read(1024, offset))
+
+        self.assertTrue(len(self.disk.reads) < 16)
+
+    def test_disabled(self):
+        sut = Readahead(self.disk)
+        sut.enabled = False
+
+        for offset in range(0, 8192, 512):
+            sut.read(512, offset)
+
+        self.assertEqual(16, len(self.disk.reads))
+
+    def test_concurrent_reads(self):
+        sut = Readahead(self.disk, max_window=64 << 10, min_window=8 << 10)
+
+        read_concurrently(self, sut, ReadaheadTests.DATA)
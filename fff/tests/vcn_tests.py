@@ -38,7 +38,8 @@ class VCNTests(TestCase):
         self.assertEqual(0x18, sut.count)
         self.assertEqual(0x5634, sut[0])
         self.assertEqual(0x18 + 0x5634 - 1, sut[-1])
-        self.assertEqual(list(range(0x5634, 0x18+0x5634)), sut[:])
+        self.assertEqual(list(range(0x5634, 0x18+0x5634)), sut.clusters)
+        self.assertEqual([(0, 0x5634, 0x18)], sut[:])
 
     def test_parse_data_runs_fragmented(self):
         input = b'\x31\x38\x73\x25\x34\x32\x14\x01\xE5\x11\x02\x31\x42\xAA\x00\x03\x00'
@@ -90,3 +91,19 @@ class VCNTests(TestCase):
 
         self.assertEqual(0x20, actual[2].length)
         self.assertEqual(0x60 + 0x100 - 0x20, actual[2].offset)
+
+    def test_vcn_sparse(self):
+        input = b'\x11\x30\x20\x01\x60\x11\x10\x30\x00'
+
+        sut = fff.ntfs.VCN(input)
+
+        self.assertEqual(0xA0, sut.count)
+        self.assertEqual(0x20, sut[0])
+        self.assertEqual(None, sut[0x30])
+        self.assertEqual(None, sut[0x8F])
+        self.assertEqual(0x50, sut[0x90])
+        self.assertEqual(0x5F, sut[-1])
+        self.assertEqual([0x4F, None, None], sut.clusters[0x2F:0x32])
+        self.assertEqual([(0x2F, 0x4F, 1), (0x30, None, 0x60), (0x90, 0x50, 2)], sut[0x2F:0x92])
+        self.assertEqual([], sut[0x20:0x10])
+        self.assertRaises(IndexError, lambda: sut[0xA0])
@@ -35,6 +35,7 @@ class UnallocatedSpace(Entity):
                  '---']]
 
     def __str__(self):
+        from tabulate import tabulate
         return tabulate(self.tabulate(),
                         headers=['#', 'Slot', 'Start', 'End', 'Length',
                                  'Description', 'CHS', ])
@@ -1,7 +1,5 @@
 from .abstract_file import AbstractFile
 
-from hexdump import hexdump
-
 import hashlib
 import collections
 from typing import Union, Iterable, cast
@@ -9,6 +7,8 @@ from typing import Union, Iterable, cast
 
 def hd(*args, **kwargs):
     """This is an alias to the `hexdump` function."""
+    from hexdump import hexdump
+
     hexdump(*args, **kwargs)
 
 
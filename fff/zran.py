@@ -0,0 +1,428 @@
+"""Random access into deflate streams, after zlib's `examples/zran.c`.
+
+A `DeflateIndex` records checkpoints at deflate block boundaries every `span`
+bytes of uncompressed output. Each checkpoint stores the compressed and the
+uncompressed offsets, the bit offset into the compressed byte, and the 32 KiB
+window preceding it, so decompression can resume there without inflating the
+stream from the beginning.
+
+Python's `zlib` module does not expose `Z_BLOCK` or `inflatePrime`, so the
+system zlib is driven through `ctypes`. `available()` tells whether it could be
+loaded; callers should fall back to plain sequential decompression otherwise.
+"""
+import ctypes
+import struct
+import zlib
+from bisect import bisect_right
+from functools import lru_cache
+from typing import IO, Any, List, Optional, Union, cast
+from io import BufferedIOBase
+
+
+WINDOW_SIZE = 32768
+CHUNK_SIZE = 1 << 18
+DEFAULT_SPAN = 1 << 24
+
+GZIP = 31
+RAW = -15
+AUTO = 47
+
+Z_OK = 0
+Z_STREAM_END = 1
+Z_NEED_DICT = 2
+Z_BUF_ERROR = -5
+Z_NO_FLUSH = 0
+Z_BLOCK = 5
+
+INDEX_MAGIC = b'FFFZRAN\x00'
+INDEX_VERSION = 1
+
+
+class _ZStream(ctypes.Structure):
+    _fields_ = [('next_in', ctypes.c_void_p),
+                ('avail_in', ctypes.c_uint),
+                ('total_in', ctypes.c_ulong),
+                ('next_out', ctypes.c_void_p),
+                ('avail_out', ctypes.c_uint),
+                ('total_out', ctypes.c_ulong),
+                ('msg', ctypes.c_char_p),
+                ('state', ctypes.c_void_p),
+                ('zalloc', ctypes.c_void_p),
+                ('zfree', ctypes.c_void_p),
+                ('opaque', ctypes.c_void_p),
+                ('data_type', ctypes.c_int),
+                ('adler', ctypes.c_ulong),
+                ('reserved', ctypes.c_ulong), ]
+
+
+@lru_cache(maxsize=None)
+def _load_zlib() -> Optional[Any]:
+    # Loaded on first use, as `find_library` may spawn a compiler or `ldconfig`.
+    import ctypes.util
+
+    for name in [ctypes.util.find_library('z'), ctypes.util.find_library('zlib1'),
+                 ctypes.util.find_library('zlib')]:
+        if not name:
+            continue
+        try:
+            lib = ctypes.CDLL(name)
+        except OSError:
+            continue
+        lib.zlibVersion.restype = ctypes.c_char_p
+        lib.inflateInit2_.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int,
+                                      ctypes.c_char_p, ctypes.c_int]
+        lib.inflate.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int]
+        lib.inflateEnd.argtypes = [ctypes.POINTER(_ZStream)]
+        lib.inflateReset.argtypes = [ctypes.POINTER(_ZStream)]
+        lib.inflateReset2.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int]
+        lib.inflatePrime.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_int, ctypes.c_int]
+        lib.inflateSetDictionary.argtypes = [ctypes.POINTER(_ZStream), ctypes.c_char_p,
+                                             ctypes.c_uint]
+        return lib
+    return None
+
+
+def available() -> bool:
+    """Whether random access decompression is supported on this platform."""
+    return _load_zlib() is not None
+
+
+class _Inflater(object):
+    def __init__(self, wbits: int):
+        libz = _load_zlib()
+        assert libz is not None
+        self._libz: Any = libz
+        self._strm = _ZStream()
+        self._input = b''
+        ret = self._libz.inflateInit2_(ctypes.byref(self._strm), wbits,
+                                       self._libz.zlibVersion(), ctypes.sizeof(_ZStream))
+        if ret != Z_OK:
+            raise zlib.error('inflateInit2 failed: {}'.format(ret))
+
+    def __del__(self):
+        if getattr(self, '_libz', None) is not None and hasattr(self, '_strm'):
+            self._libz.inflateEnd(ctypes.byref(self._strm))
+
+    @property
+    def avail_in(self) -> int:
+        return self._strm.avail_in
+
+    @property
+    def data_type(self) -> int:
+        return self._strm.data_type
+
+    @property
+    def unused(self) -> bytes:
+        n = self._strm.avail_in
+        return self._input[len(self._input) - n:] if n else b''
+
+    def feed(self, data: bytes):
+        self._input = data
+        self._strm.next_in = ctypes.cast(ctypes.c_char_p(data), ctypes.c_void_p)
+        self._strm.avail_in = len(data)
+
+    def prime(self, bits: int, value: int):
+        self._libz.inflatePrime(ctypes.byref(self._strm), bits, value)
+
+    def set_dictionary(self, window: bytes):
+        self._libz.inflateSetDictionary(ctypes.byref(self._strm), window, len(window))
+
+    def reset(self, wbits: Optional[int] = None):
+        if wbits is None:
+            self._libz.inflateReset(ctypes.byref(self._strm))
+        else:
+            self._libz.inflateReset2(ctypes.byref(self._strm), wbits)
+
+    def inflate(self, out: Any, offset: int, size: int, flush: int = Z_NO_FLUSH):
+        """Inflate into `out[offset:offset+size]`, returns (ret, consumed, produced)."""
+        avail_in = self._strm.avail_in
+        self._strm.next_out = ctypes.addressof(out) + offset
+        self._strm.avail_out = size
+        ret = self._libz.inflate(ctypes.byref(self._strm), flush)
+        if ret not in [Z_OK, Z_STREAM_END, Z_BUF_ERROR]:
+            msg = self._strm.msg.decode() if self._strm.msg else ret
+            raise zlib.error('inflate failed: {}'.format(msg))
+        return ret, avail_in - self._strm.avail_in, size - self._strm.avail_out
+
+
+class Checkpoint(object):
+    def __init__(self, out: int, in_: int, bits: int, window: bytes):
+        self.out = out
+        self.in_ = in_
+        self.bits = bits
+        self.window = window    # zlib compressed
+
+    def __repr__(self):
+        return '<Checkpoint out: {} in: {} bits: {}>'.format(self.out, self.in_, self.bits)
+
+
+FileLike = Union[IO[bytes], BufferedIOBase]
+
+
+def stamp(file: FileLike, begin: int = 0, length: Optional[int] = None) -> bytes:
+    """Identifies a compressed stream by its size and the bytes at both of its ends."""
+    if length is None:
+        file.seek(0, 2)
+        length = file.tell() - begin
+    file.seek(begin)
+    head = file.read(min(length, 32))
+    file.seek(begin + max(length - 32, 0))
+    tail = file.read(min(length, 32))
+    return struct.pack('<Q', length) + head + tail
+
+
+class DeflateIndex(object):
+    """
+    Checkpoints into a deflate, zlib or gzip stream.
+
+    Parameters
+    ----------
+    checkpoints : List[Checkpoint]
+        Checkpoints sorted by uncompressed offset.
+    size : int
+        The total uncompressed size of the stream.
+    span : int
+        The distance in uncompressed bytes between two checkpoints.
+    raw : bool
+        Whether the stream is raw deflate (e.g. a ZIP member) rather than gzip/zlib.
+
+    Attributes
+    ----------
+    path : str, optional
+        Where the index is persisted, None if it is only kept in memory.
+    """
+
+    def __init__(self, checkpoints: List[Checkpoint], size: int, span: int, raw: bool):
+        self.checkpoints = checkpoints
+        self.size = size
+        self.span = span
+        self.raw = raw
+        self.path: Optional[str] = None
+        self._outs = [c.out for c in checkpoints]
+
+    @classmethod
+    def build(cls, file: FileLike, begin: int = 0, length: Optional[int] = None,
+              span: int = DEFAULT_SPAN, raw: bool = False) -> 'DeflateIndex':
+        """Decompress the whole stream once and record a checkpoint every `span` bytes."""
+        inflater = _Inflater(RAW if raw else AUTO)
+        window = ctypes.create_string_buffer(WINDOW_SIZE)
+        checkpoints: List[Checkpoint] = []
+        total_in = 0
+        total_out = 0
+        last = 0
+        pos = 0
+        left = length
+        ended = False
+        eof = False
+
+        if raw:
+            # A raw deflate stream has no header, so start is not reported as a boundary.
+            checkpoints.append(Checkpoint(0, 0, 0, zlib.compress(b'')))
+
+        file.seek(begin)
+        while True:
+            if inflater.avail_in == 0 and not eof:
+                n = CHUNK_SIZE if left is None else min(CHUNK_SIZE, left)
+                chunk = file.read(n) if n else b''
+                if left is not None:
+                    left -= len(chunk)
+                if chunk:
+                    inflater.feed(chunk)
+                else:
+                    eof = True
+
+            try:
+                ret, consumed, produced = inflater.inflate(window, pos, WINDOW_SIZE - pos,
+                                                           Z_BLOCK)
+            except zlib.error:
+                if ended:
+                    # Trailing garbage after the last gzip member
+                    break
+                raise
+            ended = False
+            total_in += consumed
+            total_out += produced
+            pos = (pos + produced) % WINDOW_SIZE
+
+            if ret == Z_STREAM_END:
+                if raw or (eof and inflater.avail_in == 0):
+                    break
+                # Concatenated gzip members, continue with the next header.
+                ended = True
+                inflater.reset()
+                continue
+
+            data_type = inflater.data_type
+            if (data_type & 0xC0) == 0x80 and (not checkpoints or total_out - last >= span):
+                w = window.raw[pos:] + window.raw[:pos]
+                checkpoints.append(Checkpoint(total_out, total_in, data_type & 7,
+                                              zlib.compress(w)))
+                last = total_out
+
+            if ret == Z_BUF_ERROR and (eof or inflater.avail_in != 0):
+                # Truncated stream
+                break
+
+        return cls(checkpoints, total_out, span, raw)
+
+    @classmethod
+    def open(cls, file: FileLike, filepath: str, begin: int = 0, length: Optional[int] = None,
+             span: int = DEFAULT_SPAN, raw: bool = False) -> 'DeflateIndex':
+        """Load the index persisted at `filepath`, or build it and try to persist it there.
+
+        The index is only kept in memory if `filepath` is not writable, e.g. read-only
+        evidence storage.
+        """
+        s = stamp(file, begin, length)
+        index = cls.load(filepath, s)
+        if index is None or index.raw != raw:
+            index = cls.build(file, begin, length, span=span, raw=raw)
+            try:
+                index.save(filepath, s)
+            except OSError:
+                return index
+        index.path = filepath
+        return index
+
+    def checkpoint(self, offset: int) -> Checkpoint:
+        """Returns the last checkpoint at or before `offset`."""
+        i = bisect_right(self._outs, offset) - 1
+        return self.checkpoints[max(i, 0)]
+
+    def save(self, filepath: str, stamp: bytes):
+        """Persist this index, `stamp` identifies the compressed file it belongs to."""
+        with open(filepath, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(struct.pack('<IQQBI', INDEX_VERSION, self.span, self.size,
+                                self.raw, len(stamp)))
+            f.write(stamp)
+            f.write(struct.pack('<Q', len(self.checkpoints)))
+            for c in self.checkpoints:
+                f.write(struct.pack('<QQBI', c.out, c.in_, c.bits, len(c.window)))
+                f.write(c.window)
+
+    @classmethod
+    def load(cls, filepath: str, stamp: bytes) -> Optional['DeflateIndex']:
+        """Load a persisted index, returns None if it is missing, corrupted or stale."""
+        try:
+            with open(filepath, 'rb') as f:
+                if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return None
+                (version, span, size, raw,
+                 stamp_size) = struct.unpack('<IQQBI', f.read(struct.calcsize('<IQQBI')))
+                if version != INDEX_VERSION or f.read(stamp_size) != stamp:
+                    return None
+                n = struct.unpack('<Q', f.read(8))[0]
+                checkpoints = []
+                for _ in range(n):
+                    out, in_, bits, wsize = struct.unpack('<QQBI', f.read(21))
+                    window = f.read(wsize)
+                    if len(window) != wsize:
+                        return None
+                    checkpoints.append(Checkpoint(out, in_, bits, window))
+                return cls(checkpoints, size, span, bool(raw))
+        except (OSError, struct.error):
+            return None
+
+    def __repr__(self):
+        return '<DeflateIndex {} checkpoints, {} bytes>'.format(len(self.checkpoints), self.size)
+
+
+class DeflateReader(object):
+    """
+    Reads a deflate stream at arbitrary uncompressed offsets using a `DeflateIndex`.
+
+    The reader keeps the decompressor of the last read alive, so forward reads
+    within one span continue where the previous read stopped instead of going
+    back to a checkpoint. It is therefore not thread safe, use one reader per thread.
+    """
+
+    def __init__(self, file: FileLike, index: DeflateIndex, begin: int = 0,
+                 length: Optional[int] = None):
+        self.file = file
+        self.index = index
+        self.begin = begin
+        self.end = None if length is None else begin + length
+
+        self._inflater: Optional[_Inflater] = None
+        self._in = 0
+        self._out = 0
+        self._buffer = ctypes.create_string_buffer(CHUNK_SIZE)
+
+    @property
+    def size(self) -> int:
+        return self.index.size
+
+    def _start(self, offset: int):
+        c = self.index.checkpoint(offset)
+        self._inflater = _Inflater(RAW)
+        self._in = c.in_
+        self._out = c.out
+        if c.bits:
+            self._in -= 1
+            value = self._read_input(1)[0]
+            self._inflater.prime(c.bits, value >> (8 - c.bits))
+        window = zlib.decompress(c.window)
+        if window:
+            self._inflater.set_dictionary(window)
+
+    def _read_input(self, size: int) -> bytes:
+        location = self.begin + self._in
+        if self.end is not None:
+            size = max(0, min(size, self.end - location))
+        self.file.seek(location)
+        data = self.file.read(size)
+        self._in += len(data)
+        return data
+
+    def _next_member(self, inflater: _Inflater) -> bool:
+        # Skip the CRC32 and ISIZE trailer and continue with the next gzip member.
+        unused = inflater.unused
+        self._in -= len(unused)
+        self._in += 8
+        data = self._read_input(CHUNK_SIZE)
+        if not data:
+            return False
+        inflater.reset(GZIP)
+        inflater.feed(data)
+        return True
+
+    def read(self, size: int, offset: int) -> bytes:
+        size = max(0, min(size, self.size - offset))
+        if size == 0:
+            return b''
+
+        if (self._inflater is None or offset < self._out or
+                offset - self._out > self.index.span):
+            self._start(offset)
+        inflater = cast(_Inflater, self._inflater)
+
+        target = offset + size
+        result = []
+        eof = False
+        while self._out < target:
+            if inflater.avail_in == 0 and not eof:
+                data = self._read_input(CHUNK_SIZE)
+                if data:
+                    inflater.feed(data)
+                else:
+                    eof = True
+
+            # Never inflate past `target`, so the decompressor can serve the next read.
+            ret, _, produced = inflater.inflate(self._buffer, 0,
+                                                min(CHUNK_SIZE, target - self._out))
+            skip = max(offset - self._out, 0)
+            if produced > skip:
+                result.append(ctypes.string_at(ctypes.addressof(self._buffer) + skip,
+                                               produced - skip))
+            self._out += produced
+
+            if ret == Z_STREAM_END:
+                if self.index.raw or not self._next_member(inflater):
+                    self._inflater = None
+                    break
+            elif ret == Z_BUF_ERROR and (eof or inflater.avail_in != 0):
+                self._inflater = None
+                break
+
+        return b''.join(result)
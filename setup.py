@@ -20,6 +20,8 @@ setup(
     extras_require={
         'dev': [],
         'test': [],
+        # Vectorized fixups, MFT tables and gathered reads, slower pure Python otherwise.
+        'fast': ['numpy'],
     },
     test_suite='nose.collector',
     tests_require=['nose'],